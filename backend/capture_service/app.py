@@ -1,14 +1,10 @@
 import os
-import sys
 import logging
 import asyncio
 from queue import Queue
 from concurrent.futures import ThreadPoolExecutor
 from typing import List
 
-# Add parent directory to path for imports
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
 from capture_service.config import CaptureConfig
 from capture_service.rtsp_watcher import RTSPWatcher
 from capture_service.motion_filter import MotionDetector
@@ -66,6 +62,13 @@ class SkyhawkCaptureService:
         """Process frames from queue"""
         logger.info("[SKYHAWK] Frame processor started")
         
+        try:
+            await self._frame_loop()
+        finally:
+            await self.inference_client.close()
+    
+    async def _frame_loop(self):
+        """Run inference on queued frames until the service stops"""
         while self.running:
             try:
                 if self.frame_queue.empty():
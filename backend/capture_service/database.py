@@ -1,5 +1,6 @@
 import asyncio
 import logging
+from datetime import datetime
 from typing import Dict, Optional, List
 import asyncpg
 
@@ -67,12 +68,13 @@ class DetectionDatabase:
             logger.error(f"[DB] Insert error: {e}")
             return None
     
-    async def get_recent_detections(self, limit: int = 50) -> List[Dict]:
+    async def get_recent_detections(self, limit: int = 50, since: Optional[datetime] = None) -> List[Dict]:
         """
         Get recent detections
         
         Args:
             limit: Number of detections to return
+            since: Only return detections newer than this, so pollers fetch deltas
             
         Returns:
             List of detection records
@@ -86,10 +88,12 @@ class DetectionDatabase:
                 records = await conn.fetch(
                     """
                     SELECT * FROM detection_patterns
+                    WHERE $2::timestamptz IS NULL OR detection_timestamp > $2
                     ORDER BY detection_timestamp DESC
                     LIMIT $1
                     """,
                     limit,
+                    since,
                 )
                 return records
         except Exception as e:
@@ -124,7 +128,8 @@ class DetectionDatabase:
                 records = await conn.fetch(
                     """
                     SELECT * FROM detection_patterns
-                    WHERE earth_distance(
+                    WHERE earth_box(ll_to_earth($1, $2), $3 * 1000) @> ll_to_earth(latitude, longitude)
+                    AND earth_distance(
                         ll_to_earth($1, $2),
                         ll_to_earth(latitude, longitude)
                     ) < $3 * 1000
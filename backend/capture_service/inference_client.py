@@ -1,4 +1,5 @@
 import aiohttp
+import asyncio
 import logging
 import base64
 import cv2
@@ -20,6 +21,22 @@ class InferenceClient:
         """
         self.api_url = api_url.rstrip("/")
         self.timeout = timeout
+        # One keep-alive session for every frame, created on first use inside the event loop
+        self._session: Optional[aiohttp.ClientSession] = None
+    
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Shared session, so frames reuse pooled connections to the API"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self._session
+    
+    async def close(self):
+        """Close the shared session"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
     
     async def predict(self, frame: np.ndarray) -> Optional[Dict]:
         """
@@ -36,19 +53,17 @@ class InferenceClient:
             _, buffer = cv2.imencode(".jpg", frame)
             frame_b64 = base64.b64encode(buffer).decode("utf-8")
             
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f"{self.api_url}/detect",
-                    json={"image_b64": frame_b64},
-                    timeout=aiohttp.ClientTimeout(total=self.timeout),
-                ) as response:
-                    if response.status != 200:
-                        logger.error(f"[INFERENCE] API error: {response.status}")
-                        return None
-                    
-                    result = await response.json()
-                    logger.debug(f"[INFERENCE] Got {len(result.get('detections', []))} detections")
-                    return result
+            async with self._get_session().post(
+                f"{self.api_url}/detect",
+                json={"image_b64": frame_b64},
+            ) as response:
+                if response.status != 200:
+                    logger.error(f"[INFERENCE] API error: {response.status}")
+                    return None
+                
+                result = await response.json()
+                logger.debug(f"[INFERENCE] Got {len(result.get('detections', []))} detections")
+                return result
         
         except asyncio.TimeoutError:
             logger.error(f"[INFERENCE] Timeout calling {self.api_url}/detect")
@@ -16,6 +16,9 @@ class MotionDetector:
         """
         self.threshold = threshold
         self.prev_frame = None
+        # Scratch grayscale/diff buffers reused across frames of the same size
+        self._gray_scratch = None
+        self._diff_scratch = None
     
     def detect_motion(self, frame: np.ndarray) -> bool:
         """
@@ -28,23 +31,28 @@ class MotionDetector:
             True if motion detected, False otherwise
         """
         try:
-            # Convert to grayscale
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            # Convert to grayscale into the spare buffer (the other holds prev_frame)
+            size = frame.shape[:2]
+            if self._gray_scratch is None or self._gray_scratch.shape != size:
+                self._gray_scratch = np.empty(size, dtype=np.uint8)
+                self._diff_scratch = np.empty(size, dtype=np.uint8)
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=self._gray_scratch)
             
-            if self.prev_frame is None:
+            if self.prev_frame is None or self.prev_frame.shape != size:
+                self._gray_scratch = np.empty(size, dtype=np.uint8)
                 self.prev_frame = gray
                 return True
             
             # Compute absolute difference
-            diff = cv2.absdiff(self.prev_frame, gray)
+            diff = cv2.absdiff(self.prev_frame, gray, dst=self._diff_scratch)
             
-            # Threshold the difference
-            _, thresh = cv2.threshold(diff, 30, 255, cv2.THRESH_BINARY)
+            # Threshold the difference in place and count changed pixels
+            # directly, rather than summing 255s into a wide accumulator
+            cv2.threshold(diff, 30, 255, cv2.THRESH_BINARY, dst=diff)
+            motion_pixels = cv2.countNonZero(diff) / diff.size
             
-            # Calculate motion percentage
-            motion_pixels = np.sum(thresh) / (thresh.shape[0] * thresh.shape[1] * 255)
-            
-            self.prev_frame = gray
+            # Swap buffers: this frame becomes prev, the old prev is reused next call
+            self._gray_scratch, self.prev_frame = self.prev_frame, gray
             
             has_motion = motion_pixels > self.threshold
             if has_motion:
@@ -59,3 +67,5 @@ class MotionDetector:
     def reset(self):
         """Reset motion detector"""
         self.prev_frame = None
+        self._gray_scratch = None
+        self._diff_scratch = None
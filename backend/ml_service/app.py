@@ -1,25 +1,29 @@
+import io
 import os
 import sys
 import logging
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, File, UploadFile, HTTPException, Query, Form
+from fastapi import FastAPI, File, UploadFile, HTTPException, Query, Form, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 import asyncio
+import bisect
+import hashlib
+import threading
 import time
 from datetime import datetime
 import httpx
-
-# Add parent directory to path for imports
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import orjson
+import numpy as np
 
 from ml_service.models.yolo_detector import YOLODetector
 from ml_service.utils.image_processor import ImageProcessor
 from ml_service.utils.risk_scorer import RiskScorer
 from ml_service.utils.clinical_data_loader import ClinicalDataLoader
 from ml_service.utils.sormas_parser import SORMASParser
+from ml_service.utils.external_api_client import close_async_client
 
 # Configure logging
 logging.basicConfig(
@@ -33,12 +37,13 @@ yolo_detector: Optional[YOLODetector] = None
 risk_scorer: Optional[RiskScorer] = None
 clinical_loader: Optional[ClinicalDataLoader] = None
 sormas_parser: Optional[SORMASParser] = None
+image_processor: Optional[ImageProcessor] = None
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifecycle manager for app startup/shutdown"""
-    global yolo_detector, risk_scorer, clinical_loader, sormas_parser
+    global yolo_detector, risk_scorer, clinical_loader, sormas_parser, image_processor
     
     logger.info("[v2] ====== SKYHAWK ML SERVICE STARTING ======")
     logger.info("[v2] Loading production Mastomys detection model...")
@@ -46,18 +51,20 @@ async def lifespan(app: FastAPI):
     try:
         # Initialize YOLO detector with production weights
         yolo_detector = YOLODetector()
+        yolo_detector.warmup(runs=int(os.getenv("YOLO_WARMUP_RUNS", "5")))
         risk_scorer = RiskScorer()
+        image_processor = ImageProcessor()
         
         # Optional data loaders (graceful failure)
         try:
-            clinical_loader = ClinicalDataLoader()
+            clinical_loader = ClinicalDataLoader(os.getenv("CLINICAL_DATA_PATH"))
             logger.info("[v2] Clinical data loader initialized")
         except Exception as e:
             logger.warning(f"[v2] Clinical data loader unavailable: {e}")
             clinical_loader = None
         
         try:
-            sormas_parser = SORMASParser()
+            sormas_parser = SORMASParser(os.getenv("SORMAS_DICT_PATH"))
             logger.info("[v2] SORMAS parser initialized")
         except Exception as e:
             logger.warning(f"[v2] SORMAS parser unavailable: {e}")
@@ -76,9 +83,17 @@ async def lifespan(app: FastAPI):
     logger.info("[v2] Shutting down ML service...")
     if yolo_detector:
         yolo_detector.cleanup()
+    await close_async_client()
     logger.info("[v2] Cleanup complete")
 
 
+class NumpyORJSONResponse(JSONResponse):
+    """JSON response rendered by orjson, including NumPy scalars and arrays"""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+
+
 app = FastAPI(
     title="Skyhawk Mastomys Detection Service",
     description="""
@@ -100,18 +115,25 @@ app = FastAPI(
     """,
     version="2.0.0",
     lifespan=lifespan,
+    default_response_class=NumpyORJSONResponse,
     docs_url="/docs",
     redoc_url="/redoc"
 )
 
-# CORS configuration
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # Configure for production
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+# CORS configuration - only needed when browsers call this service directly.
+# Server-to-server callers (Next.js API routes, capture service) skip the middleware.
+if os.getenv("ENABLE_CORS", "0") == "1":
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=[
+            origin.strip()
+            for origin in os.getenv("CORS_ORIGINS", "http://localhost:3000").split(",")
+            if origin.strip()
+        ],
+        allow_credentials=True,
+        allow_methods=["GET", "POST"],
+        allow_headers=["Content-Type", "Authorization"],
+    )
 
 
 # ==================== RESPONSE MODELS ====================
@@ -136,7 +158,6 @@ class Detection(BaseModel):
     lassa_risk_weight: float
     detection_risk_score: float
     is_primary_reservoir: bool
-    processing_time_ms: float
     model_version: str
 
 
@@ -153,6 +174,11 @@ class DetectionResponse(BaseModel):
     remostar_analysis: Optional[Dict[str, Any]] = None
 
 
+class CorrelateBatchRequest(BaseModel):
+    points: List[Tuple[float, float]] = Field(..., min_length=1, max_length=1000)
+    radius_km: float = Field(default=50, ge=1, le=500)
+
+
 class HealthResponse(BaseModel):
     status: str
     model_loaded: bool
@@ -167,11 +193,14 @@ class ModelInfoResponse(BaseModel):
     model_path: str
     device: str
     confidence_threshold: float
+    iou_threshold: float
+    max_det: int
     task: str
     classes: List[str]
     num_classes: int
     input_size: int
     framework: str
+    precision: str
     metrics: dict
     primary_target: str
 
@@ -179,6 +208,12 @@ class ModelInfoResponse(BaseModel):
 # Track uptime
 _start_time = time.time()
 
+# In-flight inferences keyed by (image digest, confidence), shared by concurrent duplicates
+_inflight: Dict[Tuple[bytes, float], asyncio.Task] = {}
+
+# Decoded BGR image plus its detections
+DetectionResult = Tuple[np.ndarray, List[Dict[str, Any]]]
+
 
 def _remostar_endpoint() -> str:
     base = os.getenv("REMOSTAR_API_URL", "http://localhost:7777").rstrip("/")
@@ -200,6 +235,143 @@ async def _call_remostar(payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         return None
 
 
+async def _read_body(request: Request) -> bytearray:
+    """Receive a raw request body chunk by chunk, enforcing MAX_UPLOAD_SIZE_MB"""
+    max_bytes = int(os.getenv("MAX_UPLOAD_SIZE_MB", "10")) * 1024 * 1024
+    declared = int(request.headers.get("content-length") or 0)
+    if declared > max_bytes:
+        raise HTTPException(status_code=413, detail="Image exceeds maximum upload size")
+    
+    buffer = bytearray()
+    async for chunk in request.stream():
+        buffer += chunk
+        if len(buffer) > max_bytes:
+            raise HTTPException(status_code=413, detail="Image exceeds maximum upload size")
+    return buffer
+
+
+# The Ultralytics model is not safe to call from several threads at once
+_predict_lock = threading.Lock()
+
+
+def _decode_then_predict(contents: bytes, confidence: float) -> DetectionResult:
+    """Decode image bytes and run YOLO inference (blocking)"""
+    image = image_processor.load_array_from_bytes(contents)
+    with _predict_lock:
+        return image, yolo_detector.predict(image, conf_threshold=confidence)
+
+
+async def _decode_and_predict(contents: bytes, confidence: float) -> DetectionResult:
+    """Decode and infer in a worker thread so the event loop keeps serving other requests"""
+    return await asyncio.to_thread(_decode_then_predict, contents, confidence)
+
+
+async def _detect_coalesced(contents: bytes, confidence: float) -> DetectionResult:
+    """Run inference once for identical images uploaded concurrently"""
+    key = (hashlib.blake2b(contents, digest_size=16).digest(), confidence)
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.create_task(_decode_and_predict(contents, confidence))
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    # Shielded so one client disconnecting does not cancel the shared inference
+    return await asyncio.shield(task)
+
+
+async def _run_detection(
+    contents: bytes,
+    filename: str,
+    confidence: float,
+    latitude: Optional[float],
+    longitude: Optional[float],
+    enhance_with_remostar: bool,
+    start_time: float,
+    return_image: bool = False,
+):
+    """
+    Decode an image, run inference and build the /detect response payload.
+    
+    With return_image, responds with the annotated JPEG instead and moves the
+    risk summary into X-* response headers.
+    """
+    # Run YOLO inference
+    image, detections = await _detect_coalesced(contents, confidence)
+    
+    # Calculate aggregate risk score
+    risk_score = risk_scorer.score_detections(detections)
+    risk_level = _get_risk_level(risk_score)
+    
+    processing_time = (time.time() - start_time) * 1000
+    
+    # Count Mastomys, high-confidence hits and species in a single pass
+    mastomys_count = 0
+    high_conf_count = 0
+    species_detected = set()
+    for d in detections:
+        if d.get("is_primary_reservoir", False):
+            mastomys_count += 1
+        if d.get("confidence", 0) > 0.7:
+            high_conf_count += 1
+        species_detected.add(d.get("species", "unknown"))
+    
+    timestamp = datetime.utcnow().isoformat()
+    location = None
+    if latitude is not None and longitude is not None:
+        location = {"latitude": latitude, "longitude": longitude}
+
+    response = {
+        "success": True,
+        "detections": detections,
+        "risk_score": risk_score,
+        "risk_level": risk_level,
+        "processing_time_ms": round(processing_time, 2),
+        "model_version": yolo_detector.model_version,
+        "timestamp": timestamp,
+        "location": location,
+        "metadata": {
+            "filename": filename,
+            "detection_count": len(detections),
+            "mastomys_count": mastomys_count,
+            "high_confidence_count": high_conf_count,
+            "species_detected": list(species_detected),
+            "lassa_reservoir_detected": mastomys_count > 0,
+            "confidence_threshold_used": confidence
+        }
+    }
+
+    if enhance_with_remostar:
+        remostar_payload = {
+            "timestamp": timestamp,
+            "source_id": "ml_service",
+            "location": location or {},
+            "detections": [
+                {"species": d.get("species"), "confidence": d.get("confidence"), "bbox": d.get("bbox")}
+                for d in detections
+            ],
+        }
+        response["remostar_analysis"] = await _call_remostar(remostar_payload)
+    
+    # Log alert for Mastomys detection
+    if mastomys_count > 0:
+        logger.warning(f"[v2] 🚨 LASSA RISK: {mastomys_count} Mastomys natalensis in {filename}")
+    
+    logger.info(f"[v2] Complete: {len(detections)} detections, risk={risk_level}")
+    
+    if return_image:
+        jpeg = await asyncio.to_thread(yolo_detector.render_annotated_jpeg, image, detections)
+        return StreamingResponse(
+            io.BytesIO(jpeg),
+            media_type="image/jpeg",
+            headers={
+                "X-Risk-Score": str(risk_score),
+                "X-Risk-Level": risk_level,
+                "X-Detection-Count": str(len(detections)),
+                "X-Mastomys-Count": str(mastomys_count),
+            },
+        )
+    return response
+
+
 # ==================== ENDPOINTS ====================
 
 @app.get("/", tags=["Info"])
@@ -213,13 +385,16 @@ async def root():
         "endpoints": {
             "health": "GET /health",
             "detect": "POST /detect",
+            "detect_stream": "POST /detect/stream",
             "detect_batch": "POST /detect/batch",
             "model_info": "GET /model/info",
             "docs": "GET /docs",
             "clinical_cases_region": "GET /clinical/cases/region/{region}",
+            "clinical_cases_outcome": "GET /clinical/cases/outcome/{outcome}",
             "clinical_cases_recent": "GET /clinical/cases/recent",
             "clinical_statistics": "GET /clinical/statistics",
             "clinical_correlate": "POST /clinical/correlate",
+            "clinical_correlate_batch": "POST /clinical/correlate/batch",
             "sormas_fields": "GET /sormas/fields",
             "sormas_field": "GET /sormas/field/{field_name}"
         },
@@ -243,19 +418,23 @@ async def health_check():
     }
 
 
-@app.post("/detect", response_model=DetectionResponse, tags=["Detection"])
+# Detection payloads are built from trusted detector output, so they are returned
+# as plain dicts; the Pydantic models only document the schema in OpenAPI.
+@app.post("/detect", responses={200: {"model": DetectionResponse}}, tags=["Detection"])
 async def detect(
     file: UploadFile = File(...),
     confidence: float = Query(default=0.5, ge=0.1, le=1.0, description="Confidence threshold"),
     latitude: Optional[float] = Form(default=None),
     longitude: Optional[float] = Form(default=None),
     enhance_with_remostar: Optional[bool] = Form(default=False),
+    return_image: bool = Query(default=False, description="Return the annotated image as JPEG"),
 ):
     """
     Detect Mastomys in uploaded image
     
     - **file**: Image file (JPG, PNG, WEBP)
     - **confidence**: Detection confidence threshold (0.1-1.0)
+    - **return_image**: Respond with the annotated JPEG instead of JSON
     
     Returns bounding boxes, species identification, and Lassa fever risk assessment.
     """
@@ -267,67 +446,50 @@ async def detect(
     try:
         logger.info(f"[v2] Processing: {file.filename}")
         
-        # Read and process image
         contents = await file.read()
-        image_processor = ImageProcessor()
-        image = image_processor.load_image_from_bytes(contents)
-        
-        # Run YOLO inference
-        detections = yolo_detector.predict(image, conf_threshold=confidence)
-        
-        # Calculate aggregate risk score
-        risk_score = risk_scorer.score_detections(detections)
-        risk_level = _get_risk_level(risk_score)
-        
-        processing_time = (time.time() - start_time) * 1000
-        
-        # Count Mastomys specifically
-        mastomys_count = sum(1 for d in detections if d.get("is_primary_reservoir", False))
-        high_conf_count = sum(1 for d in detections if d.get("confidence", 0) > 0.7)
+        return await _run_detection(
+            contents, file.filename, confidence, latitude, longitude, enhance_with_remostar, start_time,
+            return_image=return_image,
+        )
         
-        timestamp = datetime.utcnow().isoformat()
-        location = None
-        if latitude is not None and longitude is not None:
-            location = {"latitude": latitude, "longitude": longitude}
-
-        response = {
-            "success": True,
-            "detections": detections,
-            "risk_score": round(risk_score, 4),
-            "risk_level": risk_level,
-            "processing_time_ms": round(processing_time, 2),
-            "model_version": yolo_detector.model_version,
-            "timestamp": timestamp,
-            "location": location,
-            "metadata": {
-                "filename": file.filename,
-                "detection_count": len(detections),
-                "mastomys_count": mastomys_count,
-                "high_confidence_count": high_conf_count,
-                "species_detected": list(set(d.get("species", "unknown") for d in detections)),
-                "lassa_reservoir_detected": mastomys_count > 0,
-                "confidence_threshold_used": confidence
-            }
-        }
+    except Exception as e:
+        logger.error(f"[v2] Detection error: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Detection failed: {str(e)}")
 
-        if enhance_with_remostar:
-            remostar_payload = {
-                "timestamp": timestamp,
-                "source_id": "ml_service",
-                "location": location or {},
-                "detections": [
-                    {"species": d.get("species"), "confidence": d.get("confidence"), "bbox": d.get("bbox")}
-                    for d in detections
-                ],
-            }
-            response["remostar_analysis"] = await _call_remostar(remostar_payload)
-        
-        # Log alert for Mastomys detection
-        if mastomys_count > 0:
-            logger.warning(f"[v2] 🚨 LASSA RISK: {mastomys_count} Mastomys natalensis in {file.filename}")
-        
-        logger.info(f"[v2] Complete: {len(detections)} detections, risk={risk_level}")
-        return response
+
+@app.post("/detect/stream", responses={200: {"model": DetectionResponse}}, tags=["Detection"])
+async def detect_stream(
+    request: Request,
+    confidence: float = Query(default=0.5, ge=0.1, le=1.0, description="Confidence threshold"),
+    latitude: Optional[float] = Query(default=None),
+    longitude: Optional[float] = Query(default=None),
+    enhance_with_remostar: bool = Query(default=False),
+    filename: str = Query(default="stream"),
+    return_image: bool = Query(default=False, description="Return the annotated image as JPEG"),
+):
+    """
+    Detect Mastomys in a raw image request body
+    
+    - **body**: Image bytes sent directly (Content-Type: image/jpeg, image/png, ...)
+    - **confidence**: Detection confidence threshold (0.1-1.0)
+    
+    Unlike /detect, the body is not multipart-encoded: it is received chunk by
+    chunk into a single buffer instead of being spooled and copied again.
+    """
+    if not yolo_detector:
+        raise HTTPException(status_code=503, detail="Model not loaded")
+    
+    start_time = time.time()
+    contents = await _read_body(request)
+    if not contents:
+        raise HTTPException(status_code=400, detail="Empty request body")
+    
+    try:
+        logger.info(f"[v2] Processing stream: {filename} ({len(contents)} bytes)")
+        return await _run_detection(
+            contents, filename, confidence, latitude, longitude, enhance_with_remostar, start_time,
+            return_image=return_image,
+        )
         
     except Exception as e:
         logger.error(f"[v2] Detection error: {e}", exc_info=True)
@@ -349,17 +511,19 @@ async def detect_batch(
     
     results = []
     total_mastomys = 0
+    total_detections = 0
+    successful = 0
     
     for file in files:
         try:
             contents = await file.read()
-            image_processor = ImageProcessor()
-            image = image_processor.load_image_from_bytes(contents)
-            detections = yolo_detector.predict(image, conf_threshold=confidence)
+            _, detections = await _detect_coalesced(contents, confidence)
             risk_score = risk_scorer.score_detections(detections)
             
             mastomys_count = sum(1 for d in detections if d.get("is_primary_reservoir", False))
             total_mastomys += mastomys_count
+            total_detections += len(detections)
+            successful += 1
             
             results.append({
                 "filename": file.filename,
@@ -367,7 +531,7 @@ async def detect_batch(
                 "detections": detections,
                 "detection_count": len(detections),
                 "mastomys_count": mastomys_count,
-                "risk_score": round(risk_score, 4),
+                "risk_score": risk_score,
                 "risk_level": _get_risk_level(risk_score)
             })
         except Exception as e:
@@ -382,9 +546,9 @@ async def detect_batch(
         "results": results,
         "summary": {
             "total_files": len(files),
-            "successful": sum(1 for r in results if r.get("success")),
-            "failed": sum(1 for r in results if not r.get("success")),
-            "total_detections": sum(r.get("detection_count", 0) for r in results if r.get("success")),
+            "successful": successful,
+            "failed": len(files) - successful,
+            "total_detections": total_detections,
             "total_mastomys": total_mastomys,
             "lassa_alert": total_mastomys > 0
         }
@@ -412,6 +576,16 @@ async def get_cases_by_region(region: str):
     return {"region": region, "case_count": len(cases), "cases": cases}
 
 
+@app.get("/clinical/cases/outcome/{outcome}", tags=["Clinical"])
+async def get_cases_by_outcome(outcome: str):
+    """Get Lassa Fever cases with a specific outcome"""
+    if not clinical_loader:
+        raise HTTPException(status_code=503, detail="Clinical data not loaded")
+    
+    cases = clinical_loader.get_cases_by_outcome(outcome)
+    return {"outcome": outcome, "case_count": len(cases), "cases": cases}
+
+
 @app.get("/clinical/cases/recent", tags=["Clinical"])
 async def get_recent_cases(limit: int = Query(default=10, ge=1, le=100)):
     """Get most recent Lassa Fever cases"""
@@ -445,6 +619,20 @@ async def correlate_detection(
     return correlation
 
 
+@app.post("/clinical/correlate/batch", tags=["Clinical"])
+async def correlate_detections_batch(request: CorrelateBatchRequest):
+    """Correlate several detection locations (latitude, longitude pairs) with nearby Lassa cases"""
+    if not clinical_loader:
+        raise HTTPException(status_code=503, detail="Clinical data not loaded")
+    
+    for lat, lon in request.points:
+        if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+            raise HTTPException(status_code=422, detail=f"Invalid coordinates: ({lat}, {lon})")
+    
+    correlations = clinical_loader.correlate_detections_batch(request.points, request.radius_km)
+    return {"count": len(correlations), "correlations": correlations}
+
+
 # ==================== SORMAS ENDPOINTS ====================
 
 @app.get("/sormas/fields", tags=["SORMAS"])
@@ -473,16 +661,7 @@ async def get_sormas_field_definition(field_name: str):
 
 def _get_risk_level(risk_score: float) -> str:
     """Convert risk score to categorical level"""
-    if risk_score >= 0.8:
-        return "CRITICAL"
-    elif risk_score >= 0.6:
-        return "HIGH"
-    elif risk_score >= 0.4:
-        return "MODERATE"
-    elif risk_score >= 0.2:
-        return "LOW"
-    else:
-        return "MINIMAL"
+    return RiskScorer.LEVEL_NAMES[bisect.bisect_right(RiskScorer.LEVEL_THRESHOLDS, risk_score)]
 
 
 # ==================== MAIN ====================
@@ -492,6 +671,18 @@ if __name__ == "__main__":
     
     port = int(os.getenv("PORT", "5001"))
     host = os.getenv("HOST", "0.0.0.0")
+    # Each worker loads its own copy of the model, so scale workers with memory in mind
+    workers = int(os.getenv("WORKERS", "1"))
     
-    logger.info(f"[v2] Starting Skyhawk ML Service on {host}:{port}")
-    uvicorn.run(app, host=host, port=port, log_level="info")
+    logger.info(f"[v2] Starting Skyhawk ML Service on {host}:{port} ({workers} worker(s))")
+    uvicorn.run(
+        # Multiple workers are spawned as subprocesses and need an import string
+        "ml_service.app:app" if workers > 1 else app,
+        host=host,
+        port=port,
+        # uvloop is not available on Windows
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
+        workers=workers,
+        log_level="info",
+    )
@@ -3,7 +3,7 @@ ML Service configuration module.
 Extends shared_config with YOLO-specific settings and fallback logic.
 """
 
-from backend.shared_config import Config
+from shared_config import Config
 import os
 import logging
 
@@ -13,6 +13,10 @@ logger = logging.getLogger(__name__)
 class MLConfig(Config):
     """ML-specific configuration"""
 
+    # Supported inference precisions (INT8 requires an engine, built only with
+    # YOLO_INT8_CALIB_DATA pointing at a calibration dataset YAML)
+    PRECISIONS = ("fp32", "fp16", "int8")
+
     @staticmethod
     def ml_port() -> int:
         """Get ML service port"""
@@ -29,6 +33,24 @@ class MLConfig(Config):
         device = Config.device()
         return device.lower() in ["cuda", "gpu"]
 
+    @staticmethod
+    def yolo_device() -> str:
+        """Get the device YOLODetector loads the model on by default"""
+        return os.getenv("YOLO_DEVICE", "cpu")
+
+    @staticmethod
+    def precision(device: str) -> str:
+        """
+        Get inference precision (fp32, fp16 or int8) from YOLO_PRECISION,
+        defaulting to fp16 when the model runs on a CUDA device
+        """
+        default = "fp16" if device.startswith("cuda") else "fp32"
+        precision = os.getenv("YOLO_PRECISION", default).lower()
+        if precision not in MLConfig.PRECISIONS:
+            logger.warning(f"Unknown YOLO_PRECISION '{precision}', using fp32")
+            return "fp32"
+        return precision
+
     @staticmethod
     def initialize():
         """Initialize ML config and print summary"""
@@ -36,4 +58,6 @@ class MLConfig(Config):
         logger.info(f"Port: {MLConfig.ml_port()}")
         logger.info(f"Model Cache: {MLConfig.model_cache_dir()}")
         logger.info(f"GPU Enabled: {MLConfig.enable_gpu()}")
+        logger.info(f"YOLO Device: {MLConfig.yolo_device()}")
+        logger.info(f"Precision: {MLConfig.precision(MLConfig.yolo_device())}")
         Config.print_config_summary()
@@ -1,14 +1,35 @@
 ﻿import logging
 import time
 import os
-from typing import List, Dict, Any
+import sys
+from functools import lru_cache
+from typing import List, Dict, Any, Tuple, Union
 import numpy as np
+import torch
+import torch.nn.functional as F
 from ultralytics import YOLO
 from PIL import Image
 
+from ml_service.config import MLConfig
+
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=32)
+def _resolve_model_path(candidate_paths: Tuple[str, ...]) -> str:
+    """
+    First existing path among candidates, else the first candidate.
+    
+    Memoized so repeated detector construction (forked workers, reloads) does
+    not re-stat every candidate; call _resolve_model_path.cache_clear() after
+    adding weights to a running process.
+    """
+    return next(
+        (path for path in candidate_paths if path and os.path.exists(path)),
+        candidate_paths[0]
+    )
+
+
 class YOLODetector:
     """YOLOv8 detector for Mastomys natalensis identification - Production Version"""
     
@@ -32,6 +53,18 @@ class YOLODetector:
         2: 0.1    # Other - minimal risk
     }
 
+    # Fixed network input size, the batch shapes warmed up at startup and the
+    # largest batch exported engines are built for
+    INPUT_SIZE = 640
+    WARMUP_BATCH_SIZES = (1, 2, 4, 8)
+    MAX_BATCH_SIZE = 16
+
+    # ONNX opset used for the CPU export
+    ONNX_OPSET = 17
+
+    # Inference backend by loaded model file extension
+    FRAMEWORKS = {".engine": "TensorRT/Ultralytics", ".onnx": "ONNX Runtime/Ultralytics"}
+
     def __init__(self, model_path: str = None, device: str = None):
         """
         Initialize YOLO detector with production weights
@@ -40,8 +73,17 @@ class YOLODetector:
             model_path: Path to trained model weights (best.pt)
             device: Device to run on ('cpu', 'cuda', or 'mps')
         """
-        self.device = device or os.getenv("YOLO_DEVICE", "cpu")
+        self.device = device or MLConfig.yolo_device()
         self.confidence_threshold = float(os.getenv("YOLO_CONFIDENCE_THRESHOLD", "0.5"))
+        # Explicit NMS settings: an untuned IoU threshold and no detection cap can
+        # let dense frames (rodent swarms, cluttered traps) emit thousands of boxes,
+        # making NMS and per-box response building the latency cliff
+        self.iou_threshold = float(os.getenv("YOLO_IOU_THRESHOLD", "0.5"))
+        self.max_det = int(os.getenv("YOLO_MAX_DET", "100"))
+        # Tensor Cores run FP16 at roughly twice FP32 throughput, so it is the CUDA default
+        self.precision = MLConfig.precision(self.device)
+        # Annotated images are JPEG-encoded on the GPU until that proves unsupported
+        self._gpu_jpeg = True
         
         # Model path resolution order:
         # 1. Explicit path passed in
@@ -59,26 +101,119 @@ class YOLODetector:
         legacy_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "model", "weights", "best.pt")
         candidate_paths.extend([default_path, legacy_path])
 
-        self.model_path = next(
-            (path for path in candidate_paths if path and os.path.exists(path)),
-            candidate_paths[0] if candidate_paths else default_path
-        )
+        self.model_path = _resolve_model_path(tuple(candidate_paths))
 
         if self.model_path == legacy_path:
             logger.warning("[v2] Using legacy model path: %s", legacy_path)
+
+        # On CUDA prefer a TensorRT engine for the requested precision, building
+        # and caching one next to the weights on first start. INT8 engines are
+        # only built when a calibration dataset is configured.
+        if self.device.startswith("cuda") and torch.cuda.is_available() and self.model_path.endswith(".pt"):
+            engine_path = self._engine_path(self.model_path)
+            calib_data = os.getenv("YOLO_INT8_CALIB_DATA")
+            can_build = self.precision != "int8" or calib_data
+            if not os.path.exists(engine_path) and can_build and os.path.exists(self.model_path):
+                export_args = {}
+                if self.precision == "int8":
+                    export_args = {"int8": True, "data": calib_data}
+                self._export_model(
+                    engine_path,
+                    format="engine",
+                    half=self.precision == "fp16",
+                    device=self.device,
+                    workspace=4,
+                    dynamic=True,
+                    batch=self.MAX_BATCH_SIZE,
+                    **export_args,
+                )
+            if os.path.exists(engine_path):
+                self.model_path = engine_path
+
+        # On CPU prefer a dynamic-shape ONNX graph (any batch size and letterbox
+        # shape) run through ONNX Runtime, whose fused MLAS kernels beat eager
+        # PyTorch (YOLO_CPU_ONNX=0 disables)
+        elif (
+            self.device == "cpu"
+            and self.model_path.endswith(".pt")
+            and os.getenv("YOLO_CPU_ONNX", "1") == "1"
+        ):
+            onnx_path = self._onnx_path(self.model_path)
+            if not os.path.exists(onnx_path) and os.path.exists(self.model_path):
+                self._export_model(
+                    onnx_path,
+                    format="onnx",
+                    opset=self.ONNX_OPSET,
+                    simplify=True,
+                    dynamic=True,
+                )
+            if os.path.exists(onnx_path):
+                self.model_path = onnx_path
         
-        logger.info(f"[v2] Initializing YOLODetector")
-        logger.info(f"[v2] Model path: {self.model_path}")
-        logger.info(f"[v2] Device: {self.device}")
-        logger.info(f"[v2] Confidence threshold: {self.confidence_threshold}")
+        logger.info("[v2] Initializing YOLODetector")
+        logger.info("[v2] Model path: %s", self.model_path)
+        logger.info("[v2] Device: %s", self.device)
+        logger.info("[v2] Precision: %s", self.precision)
+        logger.info("[v2] Confidence threshold: %s", self.confidence_threshold)
+        logger.info("[v2] NMS IoU threshold: %s, max detections: %d", self.iou_threshold, self.max_det)
         
         self._load_model()
+
+    def _engine_path(self, weights_path: str) -> str:
+        """
+        Path of the TensorRT engine exported from weights_path.
+        
+        Engines are only valid for the GPU and TensorRT version that built them,
+        so both are part of the file name alongside the precision.
+        """
+        stem, _ = os.path.splitext(weights_path)
+        gpu_name = torch.cuda.get_device_name(self.device).lower().replace(" ", "-")
+        try:
+            import tensorrt
+            trt_version = tensorrt.__version__
+        except ImportError:
+            trt_version = "none"
+        return f"{stem}_{self.precision}_b{self.MAX_BATCH_SIZE}_{gpu_name}_trt{trt_version}.engine"
+
+    def _onnx_path(self, weights_path: str) -> str:
+        """
+        Path of the ONNX graph exported from weights_path.
+        
+        The graph is exported with dynamic axes; that is part of the file name
+        so static batch-1 graphs cached by earlier exports are not reused.
+        """
+        stem, _ = os.path.splitext(weights_path)
+        return f"{stem}_opset{self.ONNX_OPSET}_dynamic.onnx"
+
+    def _export_model(self, export_path: str, **export_args):
+        """Export the PyTorch weights with Ultralytics and cache the result at export_path"""
+        fmt = export_args["format"]
+        logger.info("[v2] Exporting model to %s (%s), this may take a few minutes", fmt, self.precision)
+        start_time = time.time()
+        try:
+            exported = YOLO(self.model_path).export(
+                imgsz=self.INPUT_SIZE,
+                verbose=False,
+                **export_args,
+            )
+            os.replace(exported, export_path)
+            logger.info(
+                "[v2] Exported %s model cached at %s in %.1fs",
+                fmt, export_path, time.time() - start_time
+            )
+        except Exception as e:
+            logger.warning("[v2] %s export failed, using PyTorch weights: %s", fmt, e)
+
+    @property
+    def is_exported(self) -> bool:
+        """Whether the loaded model is an exported engine rather than PyTorch weights"""
+        return os.path.splitext(self.model_path)[1] in (".engine", ".onnx")
     
     def _load_model(self):
         """Load YOLO model with fallback logic"""
         try:
             if os.path.exists(self.model_path):
-                logger.info(f"[v2] Loading production model from {self.model_path}")
+                logger.info("[v2] Loading production model from %s", self.model_path)
                 self.model = YOLO(self.model_path)
                 self.model_version = "yolov8s-mastomys-production-v2"
                 self.model_metrics = {
@@ -88,25 +223,43 @@ class YOLODetector:
                     "recall": 0.714
                 }
             else:
-                logger.warning(f"[v2] Production model not found at {self.model_path}")
+                logger.warning("[v2] Production model not found at %s", self.model_path)
                 logger.warning("[v2] Falling back to base YOLOv8s model")
                 self.model = YOLO("yolov8s.pt")
                 self.model_version = "yolov8s-base-fallback"
                 self.model_metrics = {}
             
-            self.model.to(self.device)
-            logger.info(f"[v2] Model loaded successfully: {self.model_version}")
+            # Exported engines are bound to their device at export time and
+            # already have Conv+BN folded; fuse PyTorch weights once up front
+            if not self.is_exported:
+                self.model.fuse()
+                self.model.to(self.device)
+
+            # Run the PyTorch forward pass in FP16 on CUDA; INT8 without an
+            # exported engine degrades to FP16 since PyTorch has no INT8 path
+            self.half = self.device.startswith("cuda") and self.precision != "fp32"
+            if self.precision == "int8" and not self.is_exported:
+                logger.warning("[v2] No INT8 engine found, running FP16 instead")
+
+            # cuDNN benchmark mode stays off: predict() hands raw images to
+            # Ultralytics, which rect-letterboxes them to aspect-dependent
+            # shapes, and every new shape would autotune on a live request
+
+            self._init_class_tables()
+
+            logger.info("[v2] Model loaded successfully: %s", self.model_version)
             
         except Exception as e:
-            logger.error(f"[v2] Failed to load YOLO model: {e}")
+            logger.error("[v2] Failed to load YOLO model: %s", e)
             raise RuntimeError(f"Model initialization failed: {e}")
     
-    def predict(self, image: Image.Image, conf_threshold: float = None) -> List[Dict[str, Any]]:
+    @torch.inference_mode()
+    def predict(self, image: Union[Image.Image, np.ndarray], conf_threshold: float = None) -> List[Dict[str, Any]]:
         """
         Run inference on image
         
         Args:
-            image: PIL Image object
+            image: PIL Image (RGB) or BGR uint8 array as decoded by OpenCV
             conf_threshold: Confidence threshold (uses default if not specified)
         
         Returns:
@@ -117,77 +270,386 @@ class YOLODetector:
         
         try:
             # Run inference
-            results = self.model(image, conf=conf, verbose=False)
+            results = self.model(
+                image,
+                conf=conf,
+                iou=self.iou_threshold,
+                max_det=self.max_det,
+                half=self.half,
+                device=self.device,
+                verbose=False,
+            )
             
             # Parse results
             detections = []
+            mastomys_count = 0
             for result in results:
-                boxes = result.boxes
-                
-                for i, box in enumerate(boxes):
-                    class_id = int(box.cls[0])
-                    confidence = float(box.conf[0])
-                    
-                    # Get coordinates
-                    x1, y1, x2, y2 = box.xyxy[0].tolist()
-                    
-                    # Calculate Lassa risk contribution for this detection
-                    lassa_risk_weight = self.LASSA_RISK_WEIGHTS.get(class_id, 0.1)
-                    detection_risk = confidence * lassa_risk_weight
-                    
-                    detection = {
-                        "id": i,
-                        "bbox": {
-                            "x": float(x1),
-                            "y": float(y1),
-                            "width": float(x2 - x1),
-                            "height": float(y2 - y1),
-                            "x_center": float((x1 + x2) / 2),
-                            "y_center": float((y1 + y2) / 2),
-                        },
-                        "confidence": round(confidence, 4),
-                        "class_id": class_id,
-                        "class_name": result.names.get(class_id, self.CLASS_NAMES.get(class_id, "unknown")),
-                        "species": self.SPECIES_MAP.get(class_id, "Unknown"),
-                        "species_confidence": round(confidence, 4),
-                        "lassa_risk_weight": lassa_risk_weight,
-                        "detection_risk_score": round(detection_risk, 4),
-                        "is_primary_reservoir": class_id == 0,  # Mastomys natalensis
-                    }
-                    detections.append(detection)
+                soa = self._parse_result_soa(result)
+                detections.extend(self._soa_to_aos(soa))
+                mastomys_count += int(soa["is_primary_reservoir"].sum())
             
             processing_time = (time.time() - start_time) * 1000
+            self._log_mastomys(mastomys_count)
             
-            # Add timing and model info to each detection
-            for detection in detections:
-                detection["processing_time_ms"] = round(processing_time, 2)
-                detection["model_version"] = self.model_version
-            
-            logger.info(f"[v2] Inference: {len(detections)} detections in {processing_time:.2f}ms")
-            
-            # Log Mastomys-specific findings
-            mastomys_count = sum(1 for d in detections if d["is_primary_reservoir"])
-            if mastomys_count > 0:
-                logger.info(f"[v2] âš ï¸ ALERT: {mastomys_count} Mastomys natalensis detected!")
-            
+            logger.info("[v2] Inference: %d detections in %.2fms", len(detections), processing_time)
             return detections
             
         except Exception as e:
-            logger.error(f"[v2] Inference error: {e}", exc_info=True)
+            # Tracebacks only at DEBUG; the exception propagates to the caller anyway
+            logger.error("[v2] Inference error: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
             raise
     
-    def predict_batch(self, images: List[Image.Image], conf_threshold: float = None) -> List[List[Dict[str, Any]]]:
+    @torch.inference_mode()
+    def predict_soa(
+        self,
+        image: Union[Image.Image, np.ndarray],
+        conf_threshold: float = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        Run inference on image and return detections as per-field arrays
+        
+        For in-process consumers such as RiskScorer.score_soa that reduce over
+        detections; avoids building a dict per detection.
+        
+        Returns:
+            Dict of N-length arrays, see _parse_result_soa
+        """
+        conf = conf_threshold or self.confidence_threshold
+        results = self.model(
+            image,
+            conf=conf,
+            iou=self.iou_threshold,
+            max_det=self.max_det,
+            half=self.half,
+            device=self.device,
+            verbose=False,
+        )
+        soa = self._parse_result_soa(results[0])
+        self._log_mastomys(int(soa["is_primary_reservoir"].sum()))
+        return soa
+    
+    @torch.inference_mode()
+    def predict_batch(
+        self,
+        images: Union[List[Union[Image.Image, np.ndarray]], np.ndarray],
+        conf_threshold: float = None,
+        batch_size: int = None
+    ) -> List[List[Dict[str, Any]]]:
         """
         Run batch inference on multiple images
         
+        Each chunk of batch_size images is letterboxed on the inference device
+        into one (N, 3, 640, 640) tensor and run in a single forward pass;
+        boxes are mapped back to each image's original coordinates.
+        
         Args:
-            images: List of PIL Image objects
+            images: List of PIL Images (RGB) or BGR uint8 arrays, or a stacked
+                (N, H, W, 3) BGR uint8 array
             conf_threshold: Confidence threshold
+            batch_size: Images per forward pass (default 16 on GPU, 4 on CPU),
+                capped at MAX_BATCH_SIZE for exported engines
         
         Returns:
             List of detection lists, one per image
         """
-        return [self.predict(img, conf_threshold) for img in images]
+        conf = conf_threshold or self.confidence_threshold
+        if batch_size is None:
+            batch_size = 16 if self.device.startswith("cuda") else 4
+        if self.is_exported:
+            batch_size = min(batch_size, self.MAX_BATCH_SIZE)
+        
+        start_time = time.time()
+        
+        try:
+            batched_detections = []
+            for offset in range(0, len(images), batch_size):
+                batch, letterboxes = self._preprocess_batch(images[offset:offset + batch_size])
+                results = self.model(
+                    batch,
+                    conf=conf,
+                    iou=self.iou_threshold,
+                    max_det=self.max_det,
+                    half=self.half,
+                    device=self.device,
+                    verbose=False,
+                )
+                
+                # Ultralytics returns one result per input image, in order
+                for result, letterbox in zip(results, letterboxes):
+                    soa = self._parse_result_soa(result, letterbox)
+                    self._log_mastomys(int(soa["is_primary_reservoir"].sum()))
+                    batched_detections.append(self._soa_to_aos(soa))
+            
+            processing_time = (time.time() - start_time) * 1000
+            logger.info(
+                "[v2] Batch inference: %d images, %d detections in %.2fms",
+                len(images), sum(len(d) for d in batched_detections), processing_time
+            )
+            return batched_detections
+            
+        except Exception as e:
+            logger.error("[v2] Batch inference error: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
+            raise
+
+    def _init_class_tables(self):
+        """
+        Resolve per-class labels and risk weights once into arrays indexed by
+        class id. The extra last slot holds the values for unknown classes.
+        
+        Labels are interned, so every detection shares one string object per
+        label and downstream dict lookups (e.g. RiskScorer) hit on identity.
+        """
+        names = {**self.CLASS_NAMES, **dict(self.model.names)}
+        num_slots = max(names) + 2
+        self._class_name_arr = np.full(num_slots, sys.intern("unknown"), dtype=object)
+        self._species_arr = np.full(num_slots, sys.intern("Unknown"), dtype=object)
+        self._risk_arr = np.full(num_slots, 0.1)
+        for class_id, name in names.items():
+            self._class_name_arr[class_id] = sys.intern(name)
+            self._species_arr[class_id] = sys.intern(self.SPECIES_MAP.get(class_id, "Unknown"))
+            self._risk_arr[class_id] = self.LASSA_RISK_WEIGHTS.get(class_id, 0.1)
+
+    def _preprocess_batch(
+        self,
+        images: List[Union[Image.Image, np.ndarray]]
+    ) -> Tuple[torch.Tensor, List[Tuple[float, int, int, int, int]]]:
+        """
+        Letterbox images into one normalized NCHW batch on the inference device
+        
+        Returns:
+            The (N, 3, INPUT_SIZE, INPUT_SIZE) float batch in RGB order and, per
+            image, (scale, pad_left, pad_top, width, height) to undo the letterbox
+        """
+        size = self.INPUT_SIZE
+        device = self.device
+        # Ultralytics' letterbox fill value (114) in 0-1 units
+        batch = torch.full((len(images), 3, size, size), 114 / 255, dtype=torch.float32, device=device)
+        letterboxes = []
+        
+        for i, image in enumerate(images):
+            if isinstance(image, np.ndarray):
+                # BGR -> RGB channel swap happens on the device
+                pixels = self._to_device(image).permute(2, 0, 1)[[2, 1, 0]]
+            else:
+                rgb = image if image.mode == "RGB" else image.convert("RGB")
+                pixels = self._to_device(np.array(rgb)).permute(2, 0, 1)
+            
+            h, w = pixels.shape[1:]
+            scale = min(size / h, size / w)
+            new_h, new_w = round(h * scale), round(w * scale)
+            top, left = (size - new_h) // 2, (size - new_w) // 2
+            
+            resized = F.interpolate(
+                pixels.unsqueeze(0).float().div_(255),
+                size=(new_h, new_w),
+                mode="bilinear",
+                align_corners=False,
+            )
+            batch[i, :, top:top + new_h, left:left + new_w] = resized[0]
+            letterboxes.append((scale, left, top, w, h))
+        
+        return batch, letterboxes
+
+    def _to_device(self, pixels: np.ndarray) -> torch.Tensor:
+        """
+        Upload a uint8 HWC array to the inference device.
+        
+        On CUDA the array is staged in pinned memory and copied asynchronously,
+        so uploading the next image overlaps with resizing the previous one.
+        """
+        tensor = torch.from_numpy(pixels)
+        if self.device.startswith("cuda"):
+            return tensor.pin_memory().to(self.device, non_blocking=True)
+        return tensor
+
+    def _parse_result_soa(
+        self,
+        result,
+        letterbox: Tuple[float, int, int, int, int] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        Convert one Ultralytics result into per-field detection arrays
+        
+        Args:
+            result: Ultralytics Results for one image
+            letterbox: (scale, pad_left, pad_top, width, height) from
+                _preprocess_batch, to map boxes back to the original image
+        
+        Returns:
+            Dict of N-length arrays: xyxy (N, 4), conf, cls, class_name,
+            species, risk_weight, risk and is_primary_reservoir
+        """
+        # Copy the raw (N, 6) [x1, y1, x2, y2, conf, cls] tensor to host in one
+        # transfer, bypassing the Boxes wrapper's per-attribute slicing
+        data = result.boxes.data.cpu().numpy()
+        xyxy = data[:, :4].astype(np.float64)
+        if letterbox is not None:
+            scale, left, top, w, h = letterbox
+            xyxy = (xyxy - np.array([left, top, left, top])) / scale
+            xyxy = np.clip(xyxy, 0, np.array([w, h, w, h]))
+        confs = data[:, 4].astype(np.float64)
+        class_ids = data[:, 5].astype(np.int32)
+        
+        # Out-of-range class ids map to the trailing "unknown" slot
+        unknown_slot = len(self._risk_arr) - 1
+        slots = np.where((class_ids >= 0) & (class_ids < unknown_slot), class_ids, unknown_slot)
+        weights = self._risk_arr[slots]
+        
+        return {
+            "xyxy": xyxy,
+            "conf": confs,
+            "cls": class_ids,
+            "class_name": self._class_name_arr[slots],
+            "species": self._species_arr[slots],
+            "risk_weight": weights,
+            "risk": confs * weights,
+            "is_primary_reservoir": class_ids == 0,  # Mastomys natalensis
+        }
+
+    def _soa_to_aos(self, soa: Dict[str, np.ndarray]) -> List[Dict[str, Any]]:
+        """Materialize detection arrays as the per-detection dicts the API returns"""
+        xyxy = soa["xyxy"]
+        wh = xyxy[:, 2:] - xyxy[:, :2]
+        centers = (xyxy[:, :2] + xyxy[:, 2:]) / 2
+        geometry = np.column_stack((xyxy[:, :2], wh, centers)).tolist()
+        
+        return [
+            {
+                "id": i,
+                "bbox": {
+                    "x": x,
+                    "y": y,
+                    "width": width,
+                    "height": height,
+                    "x_center": x_center,
+                    "y_center": y_center,
+                },
+                "confidence": confidence,
+                "class_id": class_id,
+                "class_name": class_name,
+                "species": species_name,
+                "species_confidence": confidence,
+                "lassa_risk_weight": weight,
+                "detection_risk_score": risk,
+                "is_primary_reservoir": is_primary,
+                "model_version": self.model_version,
+            }
+            for i, (
+                (x, y, width, height, x_center, y_center),
+                confidence, class_id, class_name, species_name, weight, risk, is_primary,
+            ) in enumerate(zip(
+                geometry,
+                np.round(soa["conf"], 4).tolist(),
+                soa["cls"].tolist(),
+                soa["class_name"].tolist(),
+                soa["species"].tolist(),
+                soa["risk_weight"].tolist(),
+                np.round(soa["risk"], 4).tolist(),
+                soa["is_primary_reservoir"].tolist(),
+            ))
+        ]
+
+    def _log_mastomys(self, mastomys_count: int):
+        """Log Mastomys-specific findings for one image"""
+        if mastomys_count > 0:
+            logger.info("[v2] âš ï¸ ALERT: %d Mastomys natalensis detected!", mastomys_count)
+
+    @torch.inference_mode()
+    def warmup(self, runs: int = 5):
+        """
+        Run dummy inference on a fixed 640x640 input so the first real
+        request does not pay cuDNN autotune and kernel compilation costs.
+
+        Args:
+            runs: Number of forward passes per warmed batch size
+        """
+        start_time = time.time()
+        dummy = np.zeros((self.INPUT_SIZE, self.INPUT_SIZE, 3), dtype=np.uint8)
+
+        # Initialize CUDA kernels and allocator pools for each batch size served by predict_batch
+        if self.device.startswith("cuda"):
+            batch_sizes = self.WARMUP_BATCH_SIZES
+        else:
+            batch_sizes = (1,)
+
+        for batch_size in batch_sizes:
+            for _ in range(runs):
+                self.model(
+                    [dummy] * batch_size,
+                    imgsz=self.INPUT_SIZE,
+                    half=self.half,
+                    device=self.device,
+                    verbose=False,
+                )
+
+        logger.info(
+            "[v2] Warmup complete: batch sizes %s in %.2fms",
+            list(batch_sizes), (time.time() - start_time) * 1000
+        )
+    
+    def render_annotated_jpeg(
+        self,
+        image: Union[Image.Image, np.ndarray],
+        detections: List[Dict[str, Any]],
+        quality: int = 85
+    ) -> bytes:
+        """
+        Draw detection boxes on the image and encode it as JPEG
+        
+        On CUDA the encode runs on the GPU (nvJPEG) instead of the CPU.
+        
+        Args:
+            image: RGB PIL image or BGR array the detections were computed on
+            detections: Detections returned by predict()
+            quality: JPEG quality (1-100)
+        
+        Returns:
+            JPEG-encoded bytes
+        """
+        from torchvision.io import encode_jpeg
+        from torchvision.utils import draw_bounding_boxes
+        
+        # HWC uint8 (BGR arrays flipped to RGB) -> CHW uint8 tensor
+        if isinstance(image, np.ndarray):
+            pixels = np.ascontiguousarray(image[..., ::-1])
+        else:
+            pixels = np.array(image)
+        tensor = torch.from_numpy(pixels).permute(2, 0, 1)
+        
+        if detections:
+            boxes = torch.tensor(
+                [
+                    [
+                        d["bbox"]["x"],
+                        d["bbox"]["y"],
+                        d["bbox"]["x"] + d["bbox"]["width"],
+                        d["bbox"]["y"] + d["bbox"]["height"],
+                    ]
+                    for d in detections
+                ],
+                dtype=torch.float32,
+            )
+            labels = [f"{d['species']} {d['confidence']:.2f}" for d in detections]
+            colors = ["red" if d["is_primary_reservoir"] else "yellow" for d in detections]
+            tensor = draw_bounding_boxes(tensor, boxes, labels=labels, colors=colors, width=3)
+        
+        if self.device.startswith("cuda") and self._gpu_jpeg:
+            try:
+                return encode_jpeg(tensor.to(self.device), quality=quality).cpu().numpy().tobytes()
+            except RuntimeError as e:
+                # torchvision < 0.19 has no GPU JPEG encoder; stop trying after the first failure
+                logger.warning("[v2] GPU JPEG encoding unavailable, encoding on CPU: %s", e)
+                self._gpu_jpeg = False
+        
+        return encode_jpeg(tensor, quality=quality).numpy().tobytes()
+    
+    @property
+    def input_dtype(self) -> np.dtype:
+        """
+        Precision the loaded model runs in, for callers preparing their own
+        input tensors (e.g. ImageProcessor.preprocess_for_yolo(dtype=...))
+        """
+        return np.dtype(np.float16 if self.half else np.float32)
     
     def get_model_info(self) -> Dict[str, Any]:
         """Return model metadata"""
@@ -197,11 +659,14 @@ class YOLODetector:
             "model_path": self.model_path,
             "device": self.device,
             "confidence_threshold": self.confidence_threshold,
+            "iou_threshold": self.iou_threshold,
+            "max_det": self.max_det,
             "task": "detection",
             "classes": list(self.CLASS_NAMES.values()),
             "num_classes": len(self.CLASS_NAMES),
-            "input_size": 640,
-            "framework": "PyTorch/Ultralytics",
+            "input_size": self.INPUT_SIZE,
+            "framework": self.FRAMEWORKS.get(os.path.splitext(self.model_path)[1], "PyTorch/Ultralytics"),
+            "precision": self.precision,
             "metrics": self.model_metrics,
             "primary_target": "Mastomys natalensis (Lassa fever reservoir)",
         }
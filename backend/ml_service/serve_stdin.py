@@ -0,0 +1,141 @@
+"""
+Persistent stdin/stdout detection worker.
+
+Loads the YOLO detector once and answers newline-delimited JSON requests, so
+batch jobs can pipe a list of images through one process instead of paying
+model load and warmup per image:
+
+    find /data/trap_cameras -name '*.jpg' \
+        | jq -Rc '{image: .}' \
+        | python -m ml_service.serve_stdin > detections.ndjson
+
+Each request is {"image": path, "conf": float?}; each response line is
+{"image": path, "detections": [...]} or {"image": path, "error": message}.
+Requests arriving within a short window are grouped into one batched forward.
+"""
+
+import argparse
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, List
+
+import orjson
+
+from ml_service.models.yolo_detector import YOLODetector
+from ml_service.utils.image_processor import ImageProcessor
+
+logger = logging.getLogger(__name__)
+
+# Sentinel queued by the reader thread once stdin is exhausted
+_EOF = object()
+
+
+def _read_requests(lines: "queue.Queue[Any]"):
+    """Parse NDJSON requests from stdin onto a queue"""
+    for line in sys.stdin.buffer:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            request = orjson.loads(line)
+        except orjson.JSONDecodeError as e:
+            request = {"error": f"Invalid JSON request: {e}"}
+        if not isinstance(request, dict):
+            request = {"error": "Request must be a JSON object"}
+        lines.put(request)
+    lines.put(_EOF)
+
+
+def _collect_batch(lines: "queue.Queue[Any]", max_batch: int, window_s: float) -> List[Any]:
+    """Block for one request, then gather more until the batch fills or the window closes"""
+    batch = [lines.get()]
+    deadline = time.monotonic() + window_s
+    while batch[-1] is not _EOF and len(batch) < max_batch:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            batch.append(lines.get(timeout=remaining))
+        except queue.Empty:
+            break
+    return batch
+
+
+def _write(response: Dict[str, Any]):
+    sys.stdout.buffer.write(orjson.dumps(response, option=orjson.OPT_SERIALIZE_NUMPY) + b"\n")
+
+
+def _process(
+    detector: YOLODetector,
+    image_processor: ImageProcessor,
+    requests: List[Dict[str, Any]],
+    batch_size: int
+):
+    """Run one collected batch, grouping requests that share a confidence threshold"""
+    by_conf = defaultdict(list)
+    for request in requests:
+        if "error" in request:
+            _write(request)
+            continue
+        path = request.get("image")
+        try:
+            image = image_processor.load_array_from_path(path)
+        except (OSError, TypeError, ValueError) as e:
+            _write({"image": path, "error": str(e)})
+            continue
+        by_conf[request.get("conf")].append((path, image))
+
+    for conf, items in by_conf.items():
+        paths = [path for path, _ in items]
+        try:
+            results = detector.predict_batch([image for _, image in items], conf, batch_size)
+        except Exception as e:
+            for path in paths:
+                _write({"image": path, "error": str(e)})
+            continue
+        for path, detections in zip(paths, results):
+            _write({"image": path, "detections": detections})
+
+    sys.stdout.buffer.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve YOLO detections over stdin/stdout (NDJSON)")
+    parser.add_argument("--batch", type=int, default=None,
+                        help="Max images per forward pass (default 16 on GPU, 4 on CPU)")
+    parser.add_argument("--window-ms", type=float, default=10.0,
+                        help="How long to wait for more requests before running a batch")
+    args = parser.parse_args()
+
+    # Keep stdout clean for responses
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"), stream=sys.stderr)
+
+    detector = YOLODetector()
+    detector.warmup(runs=int(os.getenv("YOLO_WARMUP_RUNS", "5")))
+    image_processor = ImageProcessor()
+
+    batch_size = args.batch or (16 if detector.device.startswith("cuda") else 4)
+    logger.info(f"[serve] Reading NDJSON requests from stdin (batch={batch_size}, window={args.window_ms}ms)")
+    lines: "queue.Queue[Any]" = queue.Queue()
+    threading.Thread(target=_read_requests, args=(lines,), daemon=True).start()
+
+    while True:
+        batch = _collect_batch(lines, batch_size, args.window_ms / 1000)
+        done = batch[-1] is _EOF
+        if done:
+            batch.pop()
+        if batch:
+            _process(detector, image_processor, batch, batch_size)
+        if done:
+            break
+
+    detector.cleanup()
+
+
+if __name__ == "__main__":
+    main()
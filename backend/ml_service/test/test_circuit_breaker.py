@@ -0,0 +1,73 @@
+import asyncio
+
+import httpx
+import pytest
+import requests
+
+from ml_service.utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+
+def _http_error(status: int) -> requests.HTTPError:
+    response = requests.Response()
+    response.status_code = status
+    return requests.HTTPError(f"HTTP {status}", response=response)
+
+
+def _fail(breaker: CircuitBreaker, exc: BaseException):
+    with pytest.raises(type(exc)):
+        with breaker:
+            raise exc
+
+
+def _open_then_probe(breaker: CircuitBreaker):
+    """Trip the breaker and expire its cooldown so the next call is the probe"""
+    for _ in range(breaker.fail_max):
+        _fail(breaker, _http_error(503))
+    assert breaker.state == CircuitBreaker.OPEN
+    breaker._opened_at -= breaker.max_reset_timeout
+
+
+def test_not_found_does_not_trip_breaker():
+    breaker = CircuitBreaker("test", fail_max=3)
+    for _ in range(10):
+        _fail(breaker, _http_error(404))
+    assert breaker.state == CircuitBreaker.CLOSED
+    with breaker:
+        pass
+
+
+def test_server_errors_and_timeouts_trip_breaker():
+    breaker = CircuitBreaker("test", fail_max=3)
+    _fail(breaker, _http_error(503))
+    _fail(breaker, requests.exceptions.ReadTimeout())
+    _fail(breaker, httpx.ConnectError("refused"))
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        with breaker:
+            pass
+
+
+def test_rate_limit_counts_as_failure():
+    breaker = CircuitBreaker("test", fail_max=1)
+    _fail(breaker, _http_error(429))
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_cancelled_probe_is_released_without_backoff():
+    breaker = CircuitBreaker("test", fail_max=1, reset_timeout=10)
+    _open_then_probe(breaker)
+    _fail(breaker, asyncio.CancelledError())
+    assert breaker._cooldown == 10
+    # The next caller becomes the probe straight away
+    with breaker:
+        pass
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_failed_probe_backs_off():
+    breaker = CircuitBreaker("test", fail_max=1, reset_timeout=10, max_reset_timeout=15)
+    _open_then_probe(breaker)
+    _fail(breaker, _http_error(502))
+    assert breaker._cooldown == 15
+    assert breaker._wait <= 15
+    assert breaker.state == CircuitBreaker.OPEN
@@ -0,0 +1,209 @@
+"""
+In-memory TTL cache with stale-while-revalidate for slow upstream lookups.
+
+A value is served straight from memory while fresh. Once it is stale but
+still within its stale window, it is served immediately and refreshed in
+the background. If a refresh fails, the last good value keeps being served
+until a fetch succeeds. Concurrent async misses for the same key share a
+single upstream call (SingleFlight).
+"""
+
+import asyncio
+import functools
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Background refreshes for sync callers whose cache has no executor of its own
+_REFRESH_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="swr-refresh")
+
+
+class SingleFlight:
+    """
+    Collapse concurrent calls for the same key into one in-flight task.
+
+    The first caller starts the work; callers arriving while it runs await
+    the same task instead of issuing a duplicate request.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+
+    async def run(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shielded so one caller being cancelled does not cancel the shared call
+        return await asyncio.shield(task)
+
+
+class SWRCache:
+    """Bounded LRU of (value, generated_at) entries with fresh and stale TTLs"""
+
+    def __init__(self, maxsize: int = 1024, executor: Optional[ThreadPoolExecutor] = None, name: str = "swr"):
+        self.maxsize = maxsize
+        # Used in logs instead of keys, which can hold credentials (api_key arguments)
+        self.name = name
+        self._executor = executor or _REFRESH_POOL
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        # Strong references so background refresh tasks are not garbage collected
+        self._tasks = set()
+        self._flight = SingleFlight()
+
+    def _lookup(self, key: Hashable) -> Optional[Tuple[Any, float]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def _store(self, key: Hashable, value: Any):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def _claim_refresh(self, key: Hashable) -> bool:
+        """True if the caller should start a refresh for key (at most one at a time)"""
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            return True
+
+    def _release_refresh(self, key: Hashable):
+        with self._lock:
+            self._refreshing.discard(key)
+
+    @staticmethod
+    def _age(entry: Tuple[Any, float]) -> float:
+        return time.monotonic() - entry[1]
+
+    def fetch_with_swr(
+        self,
+        key: Hashable,
+        fresh_ttl: float,
+        stale_ttl: float,
+        loader: Callable[[], Any],
+        is_valid: Callable[[Any], bool] = lambda value: value is not None
+    ) -> Any:
+        """
+        Get key, calling loader() on a miss and refreshing stale hits in the background.
+
+        Results rejected by is_valid (upstream failures) are never cached; the
+        last valid value is returned instead when there is one.
+        """
+        entry = self._lookup(key)
+        if entry is not None:
+            age = self._age(entry)
+            if age < fresh_ttl:
+                return entry[0]
+            if age < stale_ttl:
+                if self._claim_refresh(key):
+                    self._executor.submit(self._refresh, key, loader, is_valid)
+                return entry[0]
+
+        value = loader()
+        if is_valid(value):
+            self._store(key, value)
+            return value
+        return entry[0] if entry is not None else value
+
+    def _refresh(self, key: Hashable, loader: Callable[[], Any], is_valid: Callable[[Any], bool]):
+        try:
+            value = loader()
+            if is_valid(value):
+                self._store(key, value)
+        except Exception as e:
+            logger.warning(f"[cache] Background refresh failed for {self.name}: {type(e).__name__}")
+        finally:
+            self._release_refresh(key)
+
+    async def fetch_with_swr_async(
+        self,
+        key: Hashable,
+        fresh_ttl: float,
+        stale_ttl: float,
+        loader: Callable[[], Any],
+        is_valid: Callable[[Any], bool] = lambda value: value is not None
+    ) -> Any:
+        """fetch_with_swr for coroutine loaders; stale hits refresh in an asyncio task"""
+        entry = self._lookup(key)
+        if entry is not None:
+            age = self._age(entry)
+            if age < fresh_ttl:
+                return entry[0]
+            if age < stale_ttl:
+                if self._claim_refresh(key):
+                    task = asyncio.create_task(self._refresh_async(key, loader, is_valid))
+                    self._tasks.add(task)
+                    task.add_done_callback(self._tasks.discard)
+                return entry[0]
+
+        value = await self._flight.run(key, loader)
+        if is_valid(value):
+            self._store(key, value)
+            return value
+        return entry[0] if entry is not None else value
+
+    async def _refresh_async(self, key: Hashable, loader: Callable[[], Any], is_valid: Callable[[Any], bool]):
+        try:
+            value = await loader()
+            if is_valid(value):
+                self._store(key, value)
+        except Exception as e:
+            logger.warning(f"[cache] Background refresh failed for {self.name}: {type(e).__name__}")
+        finally:
+            self._release_refresh(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def swr_cached(
+    fresh_ttl: float,
+    stale_ttl: float,
+    is_valid: Callable[[Any], bool] = lambda value: value is not None,
+    maxsize: int = 1024,
+    executor: Optional[ThreadPoolExecutor] = None
+):
+    """
+    Decorate a function (sync or async) with its own SWRCache keyed on its arguments.
+
+    Sync background refreshes run on executor (a shared pool by default).
+    The cache is exposed as the wrapper's .cache attribute.
+    """
+    def decorator(func):
+        cache = SWRCache(maxsize, executor, name=func.__qualname__)
+
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                key = (args, tuple(sorted(kwargs.items())))
+                return await cache.fetch_with_swr_async(
+                    key, fresh_ttl, stale_ttl, lambda: func(*args, **kwargs), is_valid
+                )
+            async_wrapper.cache = cache
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            return cache.fetch_with_swr(
+                key, fresh_ttl, stale_ttl, lambda: func(*args, **kwargs), is_valid
+            )
+        wrapper.cache = cache
+        return wrapper
+
+    return decorator
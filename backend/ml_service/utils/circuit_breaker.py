@@ -0,0 +1,192 @@
+"""
+Circuit breakers and bulkheads for external upstreams.
+
+After fail_max consecutive failures a breaker opens, and calls fail fast with
+CircuitOpenError instead of waiting on a dead upstream's timeout. Once the
+cooldown passes, a single probe call is let through (half-open). Success
+closes the breaker; failure reopens it with a longer, jittered cooldown.
+
+Each upstream also gets its own bulkhead capping its in-flight calls, so a
+slow upstream uses up only its own slots (BulkheadFullError) instead of
+every worker thread and connection the service has.
+"""
+
+import logging
+import random
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+import requests
+
+logger = logging.getLogger(__name__)
+
+
+class UpstreamUnavailable(Exception):
+    """Raised instead of calling an upstream that is failing or saturated"""
+
+
+class CircuitOpenError(UpstreamUnavailable):
+    """Raised instead of calling an upstream whose breaker is open"""
+
+
+class BulkheadFullError(UpstreamUnavailable):
+    """Raised when an upstream already has its maximum number of calls in flight"""
+
+
+# Transport-level errors that mean the upstream is unreachable or too slow
+_TRANSPORT_ERRORS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    # urllib3 retries on 502/503/504 exhausted
+    requests.exceptions.RetryError,
+    httpx.TransportError,
+)
+_HTTP_STATUS_ERRORS = (requests.exceptions.HTTPError, httpx.HTTPStatusError)
+
+
+def _classify(exc: BaseException) -> Optional[bool]:
+    """
+    True if exc means the upstream is failing (timeouts, connection errors,
+    5xx and 429 responses), False if the upstream answered normally (other
+    HTTP error statuses, e.g. a 404 for an unknown state), None if it says
+    nothing about the upstream (cancellation, bugs in the calling code)
+    """
+    if isinstance(exc, _TRANSPORT_ERRORS):
+        return True
+    if isinstance(exc, _HTTP_STATUS_ERRORS) and exc.response is not None:
+        status = exc.response.status_code
+        return status >= 500 or status == 429
+    return None
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker, used as a context manager:
+
+        with breaker:
+            response = session.get(url)
+            response.raise_for_status()
+
+    Only timeouts, connection errors and 5xx/429 responses raised inside the
+    block count as failures. Other HTTP error statuses show the upstream is
+    up and count as successes; cancellation and unrelated exceptions leave
+    the breaker as it was, apart from releasing a half-open probe.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, fail_max: int = 5, reset_timeout: float = 60, max_reset_timeout: float = 600):
+        self.name = name
+        self.fail_max = fail_max
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        # Exponential backoff base, and the jittered wait actually applied while open
+        self._cooldown = reset_timeout
+        self._wait = reset_timeout
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self._wait:
+                return self.HALF_OPEN
+            return self._state
+
+    def __enter__(self):
+        with self._lock:
+            if self._state == self.OPEN:
+                if time.monotonic() - self._opened_at < self._wait:
+                    raise CircuitOpenError(f"{self.name} circuit open")
+                # Cooldown over: let exactly this call through as the probe
+                self._state = self.HALF_OPEN
+            elif self._state == self.HALF_OPEN:
+                raise CircuitOpenError(f"{self.name} circuit half-open, probe in flight")
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        failed = False if exc is None else _classify(exc)
+        with self._lock:
+            if failed is None:
+                if self._state == self.HALF_OPEN:
+                    # Probe gave no verdict (e.g. cancelled): release it without backoff
+                    self._state = self.OPEN
+                return False
+
+            if not failed:
+                if self._state != self.CLOSED:
+                    logger.info(f"[breaker] {self.name} recovered, closing circuit")
+                self._state = self.CLOSED
+                self._failures = 0
+                self._cooldown = self.reset_timeout
+                return False
+
+            self._failures += 1
+            if self._state == self.HALF_OPEN:
+                # Failed probe: back off exponentially
+                self._cooldown = min(self._cooldown * 2, self.max_reset_timeout)
+                self._trip()
+            elif self._failures >= self.fail_max:
+                self._trip()
+        return False
+
+    def _trip(self):
+        self._state = self.OPEN
+        self._opened_at = time.monotonic()
+        # Jitter only the wait, so replicas desynchronise without the noise compounding
+        self._wait = min(self._cooldown * random.uniform(0.8, 1.2), self.max_reset_timeout)
+        logger.warning(
+            f"[breaker] {self.name} circuit open after {self._failures} failures, "
+            f"retrying in {self._wait:.0f}s"
+        )
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"state": self.state, "consecutive_failures": self._failures}
+
+
+class Bulkhead:
+    """
+    Fail-fast concurrency cap for one upstream, used as a context manager
+    around the call (works for threads and coroutines alike)
+    """
+
+    def __init__(self, name: str, max_concurrent: int = 8):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self._in_flight = 0
+        self._rejected = 0
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        with self._lock:
+            if self._in_flight >= self.max_concurrent:
+                self._rejected += 1
+                raise BulkheadFullError(f"{self.name} bulkhead full ({self.max_concurrent} calls in flight)")
+            self._in_flight += 1
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        with self._lock:
+            self._in_flight -= 1
+        return False
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"in_flight": self._in_flight, "max_concurrent": self.max_concurrent, "rejected": self._rejected}
+
+
+UPSTREAMS = ("openweather", "open_meteo", "sormas", "cdc", "nphcda")
+
+# One breaker and one bulkhead per upstream, shared by the sync and async clients
+BREAKERS: Dict[str, CircuitBreaker] = {name: CircuitBreaker(name) for name in UPSTREAMS}
+BULKHEADS: Dict[str, Bulkhead] = {name: Bulkhead(name) for name in UPSTREAMS}
+
+
+def upstream_states() -> Dict[str, Dict[str, Any]]:
+    """Breaker state and bulkhead load of every upstream, for metrics endpoints"""
+    return {name: {**BREAKERS[name].snapshot(), **BULKHEADS[name].snapshot()} for name in UPSTREAMS}
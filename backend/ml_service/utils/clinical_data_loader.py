@@ -1,10 +1,34 @@
 import logging
-from typing import List, Dict, Any, Optional
+import os
+from functools import cached_property
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 import math
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
+EARTH_RADIUS_KM = 6371
+
+# Upper bound on detection-by-case cells materialised at once by the batch
+# correlation (~32 MB of float64)
+_BATCH_CELLS = 1 << 22
+
+# Numba is optional: when installed, distance checks run as a parallel JIT
+# kernel; otherwise they fall back to the equivalent NumPy expression
+try:
+    import numba
+except ImportError:
+    numba = None
+
+if numba is not None:
+    @numba.njit(cache=True, parallel=True, fastmath=True)
+    def _haversine_km_numba(lat0, lon0, cos_lat0, lat_rad, lon_rad, cos_lat, out):
+        for i in numba.prange(lat_rad.shape[0]):
+            a = (math.sin((lat_rad[i] - lat0) / 2) ** 2 +
+                 cos_lat0 * cos_lat[i] * math.sin((lon_rad[i] - lon0) / 2) ** 2)
+            out[i] = 2 * EARTH_RADIUS_KM * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
 
 class ClinicalDataLoader:
     """
@@ -12,34 +36,175 @@ class ClinicalDataLoader:
     Integrates with SORMAS and local health databases.
     """
     
+    # Low-cardinality CSV columns stored as categoricals in the Parquet cache
+    CATEGORICAL_COLUMNS = (
+        "region", "outcome", "sex",
+        "responsibleRegion", "person.sex", "hospitalization.admittedToHealthFacility",
+    )
+    
+    # Date columns parsed once at cache time, so sorts and min/max compare
+    # fixed-width dates instead of strings
+    DATE_COLUMNS = ("date", "reportDate")
+    
     def __init__(self, data_source: str = None):
-        """Initialize with optional data source path/URL"""
+        """
+        Initialize with optional data source path/URL.
+        
+        Nothing is read here: cases load on first access and each index is
+        built the first time a query needs it.
+        """
         self.data_source = data_source
-        self._cases = []  # Will be populated from database/API
         logger.info("[ClinicalDataLoader] Initialized")
     
+    @cached_property
+    def _cases(self) -> List[Dict[str, Any]]:
+        # Will be populated from database/API when no file source is configured
+        return self._load_cases(self.data_source) if self.data_source else []
+    
+    @staticmethod
+    def _load_cases(path: str) -> List[Dict[str, Any]]:
+        """
+        Load cases from a Feather/Arrow, Parquet or CSV file.
+        
+        Feather and Parquet files are memory-mapped rather than parsed; build
+        them from exports with scripts/build-clinical-cache.py. A CSV is parsed
+        once and cached as a sibling .parquet that is reused until the CSV changes.
+        """
+        ext = os.path.splitext(path)[1].lower()
+        if ext == ".csv":
+            path = ClinicalDataLoader._cache_csv_as_parquet(path)
+            ext = ".parquet"
+        
+        if ext in (".feather", ".arrow"):
+            from pyarrow import feather
+            table = feather.read_table(path, memory_map=True)
+        elif ext == ".parquet":
+            import pyarrow.parquet as pq
+            table = pq.read_table(path, memory_map=True)
+        else:
+            raise ValueError(f"Unsupported clinical data source: {path}")
+        
+        logger.info("[ClinicalDataLoader] Loaded %d cases from %s", table.num_rows, path)
+        return table.to_pylist()
+    
+    @staticmethod
+    def _cache_csv_as_parquet(csv_path: str) -> str:
+        """Convert a CSV export to Parquet (categorical low-cardinality columns) unless already cached"""
+        parquet_path = os.path.splitext(csv_path)[0] + ".parquet"
+        if os.path.exists(parquet_path) and os.path.getmtime(parquet_path) >= os.path.getmtime(csv_path):
+            return parquet_path
+        
+        # Parse straight into Arrow buffers on multiple threads, never via pandas
+        import pyarrow as pa
+        import pyarrow.csv as pacsv
+        import pyarrow.parquet as pq
+        categorical = pa.dictionary(pa.int32(), pa.string())
+        column_types = {c: categorical for c in ClinicalDataLoader.CATEGORICAL_COLUMNS}
+        column_types.update({c: pa.string() for c in ClinicalDataLoader.DATE_COLUMNS})
+        table = pacsv.read_csv(
+            csv_path,
+            convert_options=pacsv.ConvertOptions(column_types=column_types),
+        )
+        pq.write_table(ClinicalDataLoader._parse_dates(table), parquet_path)
+        logger.info("[ClinicalDataLoader] Cached %s as %s", csv_path, parquet_path)
+        return parquet_path
+    
+    @staticmethod
+    def _parse_dates(table):
+        """
+        Convert DATE_COLUMNS from ISO 8601 strings to date32.
+        
+        Only the YYYY-MM-DD prefix is parsed, so date-only and full timestamp
+        values both convert; unparseable values become null instead of failing
+        the load.
+        """
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        present = [c for c in ClinicalDataLoader.DATE_COLUMNS if c in table.column_names]
+        if not present:
+            # Usually a misaligned header row (e.g. preamble lines above it)
+            logger.warning(
+                "[ClinicalDataLoader] No date column (%s) in %s",
+                ", ".join(ClinicalDataLoader.DATE_COLUMNS), table.column_names
+            )
+        for name in present:
+            column = table[name]
+            if not pa.types.is_string(column.type):
+                continue
+            parsed = pc.strptime(
+                pc.utf8_slice_codeunits(column, 0, 10),
+                format="%Y-%m-%d", unit="s", error_is_null=True
+            ).cast(pa.date32())
+            table = table.set_column(table.schema.get_field_index(name), name, parsed)
+        return table
+    
+    @staticmethod
+    def _group_by(cases: List[Dict[str, Any]], key: str) -> Dict[str, List[Dict[str, Any]]]:
+        """Group cases by the lowercased value of key"""
+        groups: Dict[str, List[Dict[str, Any]]] = {}
+        for case in cases:
+            groups.setdefault((case.get(key) or "").lower(), []).append(case)
+        return groups
+    
+    @cached_property
+    def _by_region(self) -> Dict[str, List[Dict[str, Any]]]:
+        return self._group_by(self._cases, "region")
+    
+    @cached_property
+    def _by_outcome(self) -> Dict[str, List[Dict[str, Any]]]:
+        return self._group_by(self._cases, "outcome")
+    
+    @cached_property
+    def _geo_index(self) -> Tuple[List[Dict[str, Any]], np.ndarray, np.ndarray, np.ndarray]:
+        """Cases with coordinates, plus their latitude/longitude (radians) and cos(latitude) arrays"""
+        geo_cases = [c for c in self._cases if c.get("latitude") and c.get("longitude")]
+        lat_rad = np.radians(np.array([c["latitude"] for c in geo_cases], dtype=np.float64))
+        lon_rad = np.radians(np.array([c["longitude"] for c in geo_cases], dtype=np.float64))
+        return geo_cases, lat_rad, lon_rad, np.cos(lat_rad)
+    
+    @cached_property
+    def _geo_unit_vectors(self) -> np.ndarray:
+        """Case coordinates as [N, 3] unit vectors, so batch distance checks are one matrix product"""
+        _, lat_rad, lon_rad, cos_lat = self._geo_index
+        return np.column_stack((cos_lat * np.cos(lon_rad), cos_lat * np.sin(lon_rad), np.sin(lat_rad)))
+    
+    @cached_property
+    def _recent(self) -> List[Dict[str, Any]]:
+        """Newest first, sorted once so recent-case queries are a slice"""
+        # Dates are date objects for cached CSVs (strings from other sources); undated cases go last
+        return sorted(
+            self._cases,
+            key=lambda x: (x.get("date") is not None, x.get("date")),
+            reverse=True
+        )
+    
     def get_cases_by_region(self, region: str) -> List[Dict[str, Any]]:
-        """Get Lassa cases for a specific region"""
+        """Get Lassa cases for a specific region (exact name, else substring match)"""
         # TODO: Connect to actual database
-        return [c for c in self._cases if c.get("region", "").lower() == region.lower()]
+        region = region.lower()
+        if region in self._by_region:
+            return self._by_region[region]
+        # Only the distinct region names are scanned, not every case
+        return [case for name, cases in self._by_region.items() if region in name for case in cases]
+    
+    def get_cases_by_outcome(self, outcome: str) -> List[Dict[str, Any]]:
+        """Get Lassa cases with a specific outcome (e.g. deceased, recovered)"""
+        return self._by_outcome.get(outcome.lower(), [])
     
     def get_recent_cases(self, limit: int = 10) -> List[Dict[str, Any]]:
         """Get most recent cases"""
-        sorted_cases = sorted(
-            self._cases,
-            key=lambda x: x.get("date", ""),
-            reverse=True
-        )
-        return sorted_cases[:limit]
+        return self._recent[:limit]
     
     def get_case_statistics(self) -> Dict[str, Any]:
         """Get aggregate statistics"""
+        # _recent is already date-ordered with undated cases last
+        dated = [c["date"] for c in self._recent if c.get("date") is not None]
         return {
             "total_cases": len(self._cases),
             "regions_affected": len(set(c.get("region") for c in self._cases)),
             "date_range": {
-                "earliest": min((c.get("date") for c in self._cases), default=None),
-                "latest": max((c.get("date") for c in self._cases), default=None)
+                "earliest": dated[-1] if dated else None,
+                "latest": dated[0] if dated else None
             }
         }
     
@@ -50,16 +215,70 @@ class ClinicalDataLoader:
         radius_km: float = 50
     ) -> Dict[str, Any]:
         """Find Lassa cases near a detection location"""
-        nearby_cases = []
+        geo_cases, lat_rad, lon_rad, cos_lat = self._geo_index
+        if not geo_cases:
+            return self._correlation(latitude, longitude, radius_km, [])
+        
+        distances = self._haversine_vec(latitude, longitude, lat_rad, lon_rad, cos_lat)
+        nearby = np.flatnonzero(distances <= radius_km)
+        return self._correlation(latitude, longitude, radius_km, [
+            {**geo_cases[idx], "distance_km": round(float(distances[idx]), 2)} for idx in nearby
+        ])
+    
+    def correlate_detections_batch(
+        self,
+        points: np.ndarray,
+        radius_km: float = 50
+    ) -> List[Dict[str, Any]]:
+        """
+        Find Lassa cases near each of several detection locations.
+        
+        Args:
+            points: [M, 2] array of (latitude, longitude) in degrees
+            radius_km: Search radius around every point
+        
+        Returns:
+            One correlate_detection_with_cases result per point, in order
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        geo_cases, lat_rad, lon_rad, cos_lat = self._geo_index
+        if not geo_cases:
+            return [self._correlation(float(lat), float(lon), radius_km, []) for lat, lon in points]
         
-        for case in self._cases:
-            case_lat = case.get("latitude")
-            case_lon = case.get("longitude")
-            if case_lat and case_lon:
-                distance = self._haversine(latitude, longitude, case_lat, case_lon)
-                if distance <= radius_km:
-                    nearby_cases.append({**case, "distance_km": round(distance, 2)})
+        # Within radius <=> angle between unit vectors <= radius / R, i.e. their
+        # dot product >= cos(radius / R); one [M, 3] x [3, N] product covers all
+        # pairs. The bound is widened slightly and matches re-checked exactly below
+        min_dot = math.cos(min(radius_km / EARTH_RADIUS_KM + 1e-6, math.pi))
+        case_vectors = self._geo_unit_vectors
+        lat_p = np.radians(points[:, 0])
+        lon_p = np.radians(points[:, 1])
+        cos_p = np.cos(lat_p)
+        point_vectors = np.column_stack((cos_p * np.cos(lon_p), cos_p * np.sin(lon_p), np.sin(lat_p)))
         
+        results = []
+        chunk = max(1, _BATCH_CELLS // len(geo_cases))
+        for start in range(0, len(points), chunk):
+            dots = point_vectors[start:start + chunk] @ case_vectors.T
+            for (lat, lon), row in zip(points[start:start + chunk], dots):
+                nearby = np.flatnonzero(row >= min_dot)
+                # Exact haversine distances for the candidates only
+                distances = self._haversine_vec(lat, lon, lat_rad[nearby], lon_rad[nearby], cos_lat[nearby])
+                within = distances <= radius_km
+                nearby, distances = nearby[within], distances[within]
+                results.append(self._correlation(float(lat), float(lon), radius_km, [
+                    {**geo_cases[idx], "distance_km": round(float(d), 2)}
+                    for idx, d in zip(nearby, distances)
+                ]))
+        return results
+    
+    @staticmethod
+    def _correlation(
+        latitude: float,
+        longitude: float,
+        radius_km: float,
+        nearby_cases: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Correlation response for one detection location"""
         return {
             "detection_location": {"lat": latitude, "lon": longitude},
             "search_radius_km": radius_km,
@@ -71,7 +290,7 @@ class ClinicalDataLoader:
     @staticmethod
     def _haversine(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
         """Calculate distance between two coordinates in km"""
-        R = 6371  # Earth's radius in km
+        R = EARTH_RADIUS_KM
         
         lat1_rad = math.radians(lat1)
         lat2_rad = math.radians(lat2)
@@ -83,3 +302,24 @@ class ClinicalDataLoader:
         c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
         
         return R * c
+    
+    @staticmethod
+    def _haversine_vec(
+        lat: float,
+        lon: float,
+        lat_rad: np.ndarray,
+        lon_rad: np.ndarray,
+        cos_lat: np.ndarray
+    ) -> np.ndarray:
+        """Distance in km from one coordinate to arrays of case coordinates (in radians)"""
+        lat0 = math.radians(lat)
+        lon0 = math.radians(lon)
+        
+        if numba is not None:
+            out = np.empty_like(lat_rad)
+            _haversine_km_numba(lat0, lon0, math.cos(lat0), lat_rad, lon_rad, cos_lat, out)
+            return out
+        
+        a = (np.sin((lat_rad - lat0) / 2) ** 2 +
+             math.cos(lat0) * cos_lat * np.sin((lon_rad - lon0) / 2) ** 2)
+        return 2 * EARTH_RADIUS_KM * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
@@ -3,21 +3,155 @@ External API client with automatic fallback to open public data.
 Handles weather, outbreak, and epidemiology data retrieval with graceful degradation.
 """
 
+import asyncio
 import logging
+import httpx
 import requests
-import json
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+from urllib3.util.retry import Retry
 import csv
 from typing import Dict, Any, Optional, List
 from datetime import datetime, timedelta
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+import orjson
+
+from ml_service.utils.cache import swr_cached
+from ml_service.utils.circuit_breaker import BREAKERS, BULKHEADS, UpstreamUnavailable
 
 logger = logging.getLogger(__name__)
 
+# Cache windows in seconds: (fresh, stale). Fresh hits skip the network, stale
+# hits are served while a background refresh runs, and an upstream failure
+# keeps serving the last good value
+WEATHER_TTL = (5 * 60, 30 * 60)
+OUTBREAK_TTL = (10 * 60, 60 * 60)
+TRENDS_TTL = (60 * 60, 24 * 60 * 60)
+STATE_HEALTH_TTL = (60 * 60, 24 * 60 * 60)
+
+
+def _weather_ok(data: Dict[str, Any]) -> bool:
+    return "error" not in data
+
+
+# Bulkheaded background refreshes: a hung upstream can only tie up its own threads
+_REFRESH_POOLS = {
+    name: ThreadPoolExecutor(max_workers=2, thread_name_prefix=f"refresh-{name}")
+    for name in ("weather", "sormas", "cdc", "nphcda")
+}
+
+# Fallback file reads from the async path run here rather than in the default
+# executor, so a slow or cold disk cannot starve image decoding and other
+# asyncio.to_thread work in the service
+_FILE_IO_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="fallback-io")
+
+
+async def _run_file_io(func, *args):
+    """Run a blocking fallback loader on the file I/O pool"""
+    return await asyncio.get_running_loop().run_in_executor(_FILE_IO_POOL, func, *args)
+
+
+@lru_cache(maxsize=8)
+def _load_json(path: str, mtime: float) -> Any:
+    """Parse a JSON file once per (path, mtime); callers must not mutate the result"""
+    with open(path, 'rb') as f:
+        return orjson.loads(f.read())
+
+
+class _CSVIndex:
+    """
+    Rows of a CSV file grouped by the lowercased value of one column.
+    
+    Parsed once on first use and re-parsed only when the file's mtime changes,
+    so fallback lookups are dict hits instead of a file scan per request.
+    """
+
+    def __init__(self, path: str, key: str):
+        self.path = path
+        self.key = key
+        self._groups: Dict[str, List[Dict[str, Any]]] = {}
+        self._mtime: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def groups(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Rows by lowercased key; empty if the file does not exist"""
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return {}
+        with self._lock:
+            if mtime != self._mtime:
+                groups: Dict[str, List[Dict[str, Any]]] = {}
+                with open(self.path, 'r') as f:
+                    for row in csv.DictReader(f):
+                        groups.setdefault((row.get(self.key) or "").lower(), []).append(row)
+                self._groups, self._mtime = groups, mtime
+            return self._groups
+
+
+def _build_session() -> requests.Session:
+    """
+    Shared HTTP session for all upstream clients.
+    
+    Reuses pooled keep-alive connections instead of a new TCP/TLS handshake
+    per call, and retries transient gateway errors with a short backoff.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=10,
+        pool_maxsize=20,
+        max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=[502, 503, 504])
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    # Advertise every encoding urllib3 can decode here (br once brotli is installed)
+    session.headers["Accept-Encoding"] = ACCEPT_ENCODING
+    return session
+
+
+_SESSION = _build_session()
+
+# Async client for the *_async methods, created on first use and bound to the
+# running event loop; close it with close_async_client() on shutdown
+_ASYNC_CLIENT: Optional[httpx.AsyncClient] = None
+
+# HTTP/2 lets concurrent lookups to the same host share one multiplexed
+# connection; it needs the h2 package (httpx[http2])
+try:
+    import h2  # noqa: F401
+    _HTTP2 = True
+except ImportError:
+    _HTTP2 = False
+
+
+def _get_async_client() -> httpx.AsyncClient:
+    global _ASYNC_CLIENT
+    if _ASYNC_CLIENT is None or _ASYNC_CLIENT.is_closed:
+        _ASYNC_CLIENT = httpx.AsyncClient(
+            http2=_HTTP2,
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+            timeout=5,
+        )
+    return _ASYNC_CLIENT
+
+
+async def close_async_client():
+    """Close the shared async client (call from the app's shutdown hook)"""
+    global _ASYNC_CLIENT
+    if _ASYNC_CLIENT is not None:
+        await _ASYNC_CLIENT.aclose()
+        _ASYNC_CLIENT = None
+
 
 class WeatherClient:
     """Weather data retrieval with fallback to Open-Meteo"""
 
     @staticmethod
+    @swr_cached(*WEATHER_TTL, is_valid=_weather_ok, executor=_REFRESH_POOLS["weather"])
     def get_weather(latitude: float, longitude: float, api_key: Optional[str] = None) -> Dict[str, Any]:
         """
         Get weather data for location.
@@ -40,9 +174,13 @@ class WeatherClient:
                 "appid": api_key,
                 "units": "metric"
             }
-            response = requests.get(url, params=params, timeout=5)
-            response.raise_for_status()
-            return response.json()
+            with BULKHEADS["openweather"], BREAKERS["openweather"]:
+                response = _SESSION.get(url, params=params, timeout=5)
+                response.raise_for_status()
+            return orjson.loads(response.content)
+        except UpstreamUnavailable:
+            # Upstream is marked down or saturated: skip the network and fall back quietly
+            return WeatherClient._get_open_meteo(latitude, longitude)
         except Exception as e:
             logger.error(f"OpenWeather API failed: {e}, falling back to Open-Meteo")
             return WeatherClient._get_open_meteo(latitude, longitude)
@@ -58,17 +196,71 @@ class WeatherClient:
                 "current": "temperature_2m,relative_humidity_2m,precipitation",
                 "timezone": "auto"
             }
-            response = requests.get(url, params=params, timeout=5)
-            response.raise_for_status()
-            data = response.json()
-            
-            return {
-                "current": {
-                    "temp": data["current"]["temperature_2m"],
-                    "humidity": data["current"]["relative_humidity_2m"],
-                    "precipitation": data["current"]["precipitation"]
-                }
+            with BULKHEADS["open_meteo"], BREAKERS["open_meteo"]:
+                response = _SESSION.get(url, params=params, timeout=5)
+                response.raise_for_status()
+            return WeatherClient._parse_open_meteo(orjson.loads(response.content))
+        except UpstreamUnavailable as e:
+            return {"error": str(e), "source": "open-meteo"}
+        except Exception as e:
+            logger.error(f"Open-Meteo API failed: {e}")
+            return {"error": str(e), "source": "open-meteo"}
+
+    @staticmethod
+    def _parse_open_meteo(data: Dict[str, Any]) -> Dict[str, Any]:
+        """Reshape an Open-Meteo response to the OpenWeather-style fields we use"""
+        return {
+            "current": {
+                "temp": data["current"]["temperature_2m"],
+                "humidity": data["current"]["relative_humidity_2m"],
+                "precipitation": data["current"]["precipitation"]
             }
+        }
+
+    @staticmethod
+    @swr_cached(*WEATHER_TTL, is_valid=_weather_ok, executor=_REFRESH_POOLS["weather"])
+    async def get_weather_async(latitude: float, longitude: float, api_key: Optional[str] = None) -> Dict[str, Any]:
+        """Async get_weather"""
+        if api_key:
+            return await WeatherClient._get_openweather_async(latitude, longitude, api_key)
+        logger.info("No OpenWeather key, using Open-Meteo fallback")
+        return await WeatherClient._get_open_meteo_async(latitude, longitude)
+
+    @staticmethod
+    async def _get_openweather_async(latitude: float, longitude: float, api_key: str) -> Dict[str, Any]:
+        """Get data from OpenWeather API without blocking the event loop"""
+        try:
+            with BULKHEADS["openweather"], BREAKERS["openweather"]:
+                response = await _get_async_client().get(
+                    "https://api.openweathermap.org/data/2.5/weather",
+                    params={"lat": latitude, "lon": longitude, "appid": api_key, "units": "metric"}
+                )
+                response.raise_for_status()
+            return orjson.loads(response.content)
+        except UpstreamUnavailable:
+            return await WeatherClient._get_open_meteo_async(latitude, longitude)
+        except Exception as e:
+            logger.error(f"OpenWeather API failed: {e}, falling back to Open-Meteo")
+            return await WeatherClient._get_open_meteo_async(latitude, longitude)
+
+    @staticmethod
+    async def _get_open_meteo_async(latitude: float, longitude: float) -> Dict[str, Any]:
+        """Get data from Open-Meteo without blocking the event loop"""
+        try:
+            with BULKHEADS["open_meteo"], BREAKERS["open_meteo"]:
+                response = await _get_async_client().get(
+                    "https://api.open-meteo.com/v1/forecast",
+                    params={
+                        "latitude": latitude,
+                        "longitude": longitude,
+                        "current": "temperature_2m,relative_humidity_2m,precipitation",
+                        "timezone": "auto"
+                    }
+                )
+                response.raise_for_status()
+            return WeatherClient._parse_open_meteo(orjson.loads(response.content))
+        except UpstreamUnavailable as e:
+            return {"error": str(e), "source": "open-meteo"}
         except Exception as e:
             logger.error(f"Open-Meteo API failed: {e}")
             return {"error": str(e), "source": "open-meteo"}
@@ -79,6 +271,26 @@ class OutbreakClient:
 
     MOCK_DATA_FILE = os.path.join(os.path.dirname(__file__), "../data/mock/sormas_outbreaks.json")
 
+    # Built-in fallback, stamped once at import rather than per request
+    _DEFAULT_OUTBREAKS = [
+        {
+            "id": "mock-1",
+            "disease": "Lassa Fever",
+            "region": "Edo State",
+            "cases": 5,
+            "deaths": 1,
+            "last_updated": datetime.now().isoformat()
+        },
+        {
+            "id": "mock-2",
+            "disease": "Lassa Fever",
+            "region": "Bauchi State",
+            "cases": 3,
+            "deaths": 0,
+            "last_updated": datetime.now().isoformat()
+        }
+    ]
+
     @staticmethod
     def get_outbreaks(api_key: Optional[str] = None, api_url: Optional[str] = None) -> List[Dict[str, Any]]:
         """
@@ -94,52 +306,74 @@ class OutbreakClient:
         return OutbreakClient._get_mock_outbreaks()
 
     @staticmethod
+    @swr_cached(*OUTBREAK_TTL, executor=_REFRESH_POOLS["sormas"])
     def _get_sormas_outbreaks(api_key: str, api_url: str) -> Optional[List[Dict[str, Any]]]:
         """Get data from SORMAS API"""
         try:
             headers = {"Authorization": f"Bearer {api_key}"}
-            response = requests.get(f"{api_url}/outbreaks", headers=headers, timeout=10)
-            response.raise_for_status()
-            return response.json()
+            with BULKHEADS["sormas"], BREAKERS["sormas"]:
+                response = _SESSION.get(f"{api_url}/outbreaks", headers=headers, timeout=10)
+                response.raise_for_status()
+            return orjson.loads(response.content)
+        except UpstreamUnavailable:
+            return None
+        except Exception as e:
+            logger.error(f"SORMAS API failed: {e}")
+            return None
+
+    @staticmethod
+    async def get_outbreaks_async(api_key: Optional[str] = None, api_url: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Async get_outbreaks; the mock file fallback is read off the event loop"""
+        if api_key and api_url:
+            result = await OutbreakClient._get_sormas_outbreaks_async(api_key, api_url)
+            if result is not None:
+                return result
+        
+        logger.info("Using mock outbreak data (fallback)")
+        return await _run_file_io(OutbreakClient._get_mock_outbreaks)
+
+    @staticmethod
+    @swr_cached(*OUTBREAK_TTL, executor=_REFRESH_POOLS["sormas"])
+    async def _get_sormas_outbreaks_async(api_key: str, api_url: str) -> Optional[List[Dict[str, Any]]]:
+        """Get data from SORMAS API without blocking the event loop"""
+        try:
+            with BULKHEADS["sormas"], BREAKERS["sormas"]:
+                response = await _get_async_client().get(
+                    f"{api_url}/outbreaks",
+                    headers={"Authorization": f"Bearer {api_key}"},
+                    timeout=10
+                )
+                response.raise_for_status()
+            return orjson.loads(response.content)
+        except UpstreamUnavailable:
+            return None
         except Exception as e:
             logger.error(f"SORMAS API failed: {e}")
             return None
 
     @staticmethod
     def _get_mock_outbreaks() -> List[Dict[str, Any]]:
-        """Load mock outbreak data from JSON file"""
+        """
+        Load mock outbreak data from JSON file.
+        
+        The file is parsed once and re-read only when it changes; the returned
+        list is shared, so callers must not mutate it.
+        """
         try:
             if os.path.exists(OutbreakClient.MOCK_DATA_FILE):
-                with open(OutbreakClient.MOCK_DATA_FILE, 'r') as f:
-                    return json.load(f)
+                return _load_json(OutbreakClient.MOCK_DATA_FILE, os.path.getmtime(OutbreakClient.MOCK_DATA_FILE))
         except Exception as e:
             logger.error(f"Failed to load mock outbreak data: {e}")
         
         # Fallback mock data
-        return [
-            {
-                "id": "mock-1",
-                "disease": "Lassa Fever",
-                "region": "Edo State",
-                "cases": 5,
-                "deaths": 1,
-                "last_updated": datetime.now().isoformat()
-            },
-            {
-                "id": "mock-2",
-                "disease": "Lassa Fever",
-                "region": "Bauchi State",
-                "cases": 3,
-                "deaths": 0,
-                "last_updated": datetime.now().isoformat()
-            }
-        ]
+        return OutbreakClient._DEFAULT_OUTBREAKS
 
 
 class EpidemiologyClient:
     """Disease epidemiology data with fallback to CSV"""
 
     MOCK_DATA_FILE = os.path.join(os.path.dirname(__file__), "../data/mock/cdc_trends.csv")
+    _TRENDS_INDEX = _CSVIndex(MOCK_DATA_FILE, "disease")
 
     @staticmethod
     def get_disease_trends(disease: str = "lassa_fever", api_key: Optional[str] = None) -> Dict[str, Any]:
@@ -156,17 +390,51 @@ class EpidemiologyClient:
         return EpidemiologyClient._get_mock_trends(disease)
 
     @staticmethod
+    @swr_cached(*TRENDS_TTL, executor=_REFRESH_POOLS["cdc"])
     def _get_cdc_trends(disease: str, api_key: str) -> Optional[Dict[str, Any]]:
         """Get data from CDC API"""
         try:
             headers = {"X-API-Key": api_key}
-            response = requests.get(
-                f"https://api.cdc.gov/disease/{disease}/trends",
-                headers=headers,
-                timeout=10
-            )
-            response.raise_for_status()
-            return response.json()
+            with BULKHEADS["cdc"], BREAKERS["cdc"]:
+                response = _SESSION.get(
+                    f"https://api.cdc.gov/disease/{disease}/trends",
+                    headers=headers,
+                    timeout=10
+                )
+                response.raise_for_status()
+            return orjson.loads(response.content)
+        except UpstreamUnavailable:
+            return None
+        except Exception as e:
+            logger.error(f"CDC API failed: {e}")
+            return None
+
+    @staticmethod
+    async def get_disease_trends_async(disease: str = "lassa_fever", api_key: Optional[str] = None) -> Dict[str, Any]:
+        """Async get_disease_trends; the CSV fallback is read off the event loop"""
+        if api_key:
+            result = await EpidemiologyClient._get_cdc_trends_async(disease, api_key)
+            if result is not None:
+                return result
+        
+        logger.info("Using CDC epidemiology CSV (fallback)")
+        return await _run_file_io(EpidemiologyClient._get_mock_trends, disease)
+
+    @staticmethod
+    @swr_cached(*TRENDS_TTL, executor=_REFRESH_POOLS["cdc"])
+    async def _get_cdc_trends_async(disease: str, api_key: str) -> Optional[Dict[str, Any]]:
+        """Get data from CDC API without blocking the event loop"""
+        try:
+            with BULKHEADS["cdc"], BREAKERS["cdc"]:
+                response = await _get_async_client().get(
+                    f"https://api.cdc.gov/disease/{disease}/trends",
+                    headers={"X-API-Key": api_key},
+                    timeout=10
+                )
+                response.raise_for_status()
+            return orjson.loads(response.content)
+        except UpstreamUnavailable:
+            return None
         except Exception as e:
             logger.error(f"CDC API failed: {e}")
             return None
@@ -176,12 +444,11 @@ class EpidemiologyClient:
         """Load mock epidemiology data from CSV"""
         trends = []
         try:
-            if os.path.exists(EpidemiologyClient.MOCK_DATA_FILE):
-                with open(EpidemiologyClient.MOCK_DATA_FILE, 'r') as f:
-                    reader = csv.DictReader(f)
-                    for row in reader:
-                        if disease.lower() in row.get("disease", "").lower():
-                            trends.append(row)
+            # Substring match over the distinct disease names, not every row
+            disease = disease.lower()
+            for name, rows in EpidemiologyClient._TRENDS_INDEX.groups().items():
+                if disease in name:
+                    trends.extend(rows)
         except Exception as e:
             logger.error(f"Failed to load mock trends: {e}")
         
@@ -205,6 +472,7 @@ class NigeriaHealthClient:
     """Nigeria-specific health data with fallback to CSV"""
 
     MOCK_DATA_FILE = os.path.join(os.path.dirname(__file__), "../data/mock/nigeria_health.csv")
+    _STATE_INDEX = _CSVIndex(MOCK_DATA_FILE, "state")
 
     @staticmethod
     def get_state_health_data(state: str, api_key: Optional[str] = None, api_url: Optional[str] = None) -> Dict[str, Any]:
@@ -221,17 +489,55 @@ class NigeriaHealthClient:
         return NigeriaHealthClient._get_mock_state_data(state)
 
     @staticmethod
+    @swr_cached(*STATE_HEALTH_TTL, executor=_REFRESH_POOLS["nphcda"])
     def _get_nphcda_data(state: str, api_key: str, api_url: str) -> Optional[Dict[str, Any]]:
         """Get data from NPHCDA API"""
         try:
             headers = {"Authorization": f"Bearer {api_key}"}
-            response = requests.get(
-                f"{api_url}/states/{state}",
-                headers=headers,
-                timeout=10
-            )
-            response.raise_for_status()
-            return response.json()
+            with BULKHEADS["nphcda"], BREAKERS["nphcda"]:
+                response = _SESSION.get(
+                    f"{api_url}/states/{state}",
+                    headers=headers,
+                    timeout=10
+                )
+                response.raise_for_status()
+            return orjson.loads(response.content)
+        except UpstreamUnavailable:
+            return None
+        except Exception as e:
+            logger.error(f"NPHCDA API failed: {e}")
+            return None
+
+    @staticmethod
+    async def get_state_health_data_async(
+        state: str,
+        api_key: Optional[str] = None,
+        api_url: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Async get_state_health_data; the CSV fallback is read off the event loop"""
+        if api_key and api_url:
+            result = await NigeriaHealthClient._get_nphcda_data_async(state, api_key, api_url)
+            if result is not None:
+                return result
+        
+        logger.info("Using Nigeria health CSV (fallback)")
+        return await _run_file_io(NigeriaHealthClient._get_mock_state_data, state)
+
+    @staticmethod
+    @swr_cached(*STATE_HEALTH_TTL, executor=_REFRESH_POOLS["nphcda"])
+    async def _get_nphcda_data_async(state: str, api_key: str, api_url: str) -> Optional[Dict[str, Any]]:
+        """Get data from NPHCDA API without blocking the event loop"""
+        try:
+            with BULKHEADS["nphcda"], BREAKERS["nphcda"]:
+                response = await _get_async_client().get(
+                    f"{api_url}/states/{state}",
+                    headers={"Authorization": f"Bearer {api_key}"},
+                    timeout=10
+                )
+                response.raise_for_status()
+            return orjson.loads(response.content)
+        except UpstreamUnavailable:
+            return None
         except Exception as e:
             logger.error(f"NPHCDA API failed: {e}")
             return None
@@ -240,12 +546,9 @@ class NigeriaHealthClient:
     def _get_mock_state_data(state: str) -> Dict[str, Any]:
         """Load mock Nigeria state health data"""
         try:
-            if os.path.exists(NigeriaHealthClient.MOCK_DATA_FILE):
-                with open(NigeriaHealthClient.MOCK_DATA_FILE, 'r') as f:
-                    reader = csv.DictReader(f)
-                    for row in reader:
-                        if row.get("state", "").lower() == state.lower():
-                            return row
+            rows = NigeriaHealthClient._STATE_INDEX.groups().get(state.lower())
+            if rows:
+                return dict(rows[0])
         except Exception as e:
             logger.error(f"Failed to load mock Nigeria data: {e}")
         
@@ -257,3 +560,35 @@ class NigeriaHealthClient:
             "rodent_control_units": 3,
             "outbreak_alerts": 2
         }
+
+
+async def gather_context(
+    latitude: float,
+    longitude: float,
+    state: str,
+    disease: str = "lassa_fever",
+    weather_api_key: Optional[str] = None,
+    sormas_api_key: Optional[str] = None,
+    sormas_api_url: Optional[str] = None,
+    cdc_api_key: Optional[str] = None,
+    nphcda_api_key: Optional[str] = None,
+    nphcda_api_url: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Fetch weather, outbreak, trend and state health context concurrently.
+    
+    Total latency is the slowest upstream rather than the sum of all four;
+    each lookup still degrades to its own fallback independently.
+    """
+    weather, outbreaks, trends, state_health = await asyncio.gather(
+        WeatherClient.get_weather_async(latitude, longitude, weather_api_key),
+        OutbreakClient.get_outbreaks_async(sormas_api_key, sormas_api_url),
+        EpidemiologyClient.get_disease_trends_async(disease, cdc_api_key),
+        NigeriaHealthClient.get_state_health_data_async(state, nphcda_api_key, nphcda_api_url),
+    )
+    return {
+        "weather": weather,
+        "outbreaks": outbreaks,
+        "disease_trends": trends,
+        "state_health": state_health,
+    }
@@ -1,21 +1,52 @@
 import logging
 import io
-from typing import Tuple, Optional
+import threading
+from typing import Tuple, Optional, Union
 from PIL import Image
 import numpy as np
+import cv2
 
 logger = logging.getLogger(__name__)
 
+# PyTurboJPEG is optional: when it and libturbojpeg are installed, JPEGs are
+# decoded by libjpeg-turbo directly; otherwise OpenCV's decoder is used
+try:
+    from turbojpeg import TurboJPEG, TJPF_BGR
+    _turbojpeg = TurboJPEG()
+except (ImportError, OSError, RuntimeError):
+    _turbojpeg = None
+
+# torch is optional here: with CUDA available, YOLO input buffers are allocated
+# in pinned (page-locked) memory so uploads can be asynchronous
+try:
+    import torch
+except ImportError:
+    torch = None
+
 
 class ImageProcessor:
     """Image preprocessing for YOLO inference"""
     
     SUPPORTED_FORMATS = {'JPEG', 'PNG', 'WEBP', 'BMP', 'GIF'}
+    # Signatures of formats OpenCV decodes itself (SIMD libjpeg-turbo/libpng);
+    # anything else (GIF, ...) goes through PIL
+    JPEG_SIGNATURE = b'\xff\xd8\xff'
+    OPENCV_SIGNATURES = (JPEG_SIGNATURE, b'\x89PNG', b'BM')
+    # JPEG DCT-domain downscale factors and the matching OpenCV decode flags
+    JPEG_REDUCTIONS = {
+        1: cv2.IMREAD_COLOR,
+        2: cv2.IMREAD_REDUCED_COLOR_2,
+        4: cv2.IMREAD_REDUCED_COLOR_4,
+        8: cv2.IMREAD_REDUCED_COLOR_8,
+    }
     MAX_SIZE = 4096  # Max dimension
     TARGET_SIZE = 640  # YOLO input size
     
     def __init__(self):
-        pass
+        # Per-thread (1, 3, TARGET_SIZE, TARGET_SIZE) outputs of preprocess_for_yolo,
+        # by dtype, as (array, torch tensor sharing its memory or None)
+        self._yolo_buffers = threading.local()
+        self._pin_memory = torch is not None and torch.cuda.is_available()
     
     def load_image_from_bytes(self, image_bytes: bytes) -> Image.Image:
         """
@@ -54,6 +85,86 @@ class ImageProcessor:
         with open(path, 'rb') as f:
             return self.load_image_from_bytes(f.read())
     
+    def load_array_from_path(self, path: str) -> np.ndarray:
+        """
+        Decode an image file straight to a BGR uint8 array with OpenCV.
+        
+        Skips the PIL round-trip; Ultralytics takes BGR arrays as-is.
+        """
+        try:
+            image = cv2.imread(str(path), cv2.IMREAD_COLOR)
+        except cv2.error as e:
+            raise ValueError(f"Invalid image data: {e}")
+        if image is None:
+            raise ValueError(f"Could not read image: {path}")
+        
+        return self._limit_size(image)
+    
+    def load_array_from_bytes(self, image_bytes: bytes) -> np.ndarray:
+        """
+        Decode image bytes to a BGR uint8 array.
+        
+        JPEG (the usual camera-trap case) takes a dedicated path; PNG, BMP and
+        WebP are decoded by OpenCV directly from the buffer; other formats
+        fall back to PIL.
+        """
+        if bytes(image_bytes[:3]) == self.JPEG_SIGNATURE:
+            return self._limit_size(self._decode_jpeg(image_bytes))
+        
+        if self._opencv_decodable(image_bytes):
+            try:
+                image = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_COLOR)
+            except cv2.error as e:
+                raise ValueError(f"Invalid image data: {e}")
+            if image is None:
+                raise ValueError("Invalid image data: could not decode")
+            return self._limit_size(image)
+        
+        rgb = self.load_image_from_bytes(image_bytes)
+        return cv2.cvtColor(np.asarray(rgb), cv2.COLOR_RGB2BGR)
+    
+    def _decode_jpeg(self, image_bytes: bytes) -> np.ndarray:
+        """
+        Decode a JPEG to BGR, downscaling by 1/2, 1/4 or 1/8 inside the
+        decoder when the image exceeds MAX_SIZE so no full-size pass is made
+        """
+        scale = self._jpeg_reduction(image_bytes)
+        try:
+            if _turbojpeg is not None:
+                return _turbojpeg.decode(image_bytes, pixel_format=TJPF_BGR, scaling_factor=(1, scale))
+            image = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), self.JPEG_REDUCTIONS[scale])
+        except (OSError, cv2.error) as e:
+            raise ValueError(f"Invalid image data: {e}")
+        if image is None:
+            raise ValueError("Invalid image data: could not decode")
+        return image
+    
+    def _jpeg_reduction(self, image_bytes: bytes) -> int:
+        """Smallest JPEG_REDUCTIONS factor that brings the longest side to MAX_SIZE or below"""
+        try:
+            # Only the header is parsed here, not the pixel data
+            longest = max(Image.open(io.BytesIO(image_bytes)).size)
+        except Exception:
+            return 1
+        for factor in self.JPEG_REDUCTIONS:
+            if longest <= self.MAX_SIZE * factor:
+                return factor
+        return max(self.JPEG_REDUCTIONS)
+    
+    def _opencv_decodable(self, image_bytes: bytes) -> bool:
+        head = bytes(image_bytes[:12])
+        return head.startswith(self.OPENCV_SIGNATURES) or (head[:4] == b'RIFF' and head[8:12] == b'WEBP')
+    
+    def _limit_size(self, image: np.ndarray) -> np.ndarray:
+        """Downscale a BGR array so its longest side is at most MAX_SIZE"""
+        h, w = image.shape[:2]
+        if max(h, w) > self.MAX_SIZE:
+            scale = self.MAX_SIZE / max(h, w)
+            image = cv2.resize(image, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_AREA)
+            logger.info(f"Resized large image to {image.shape[1]}x{image.shape[0]}")
+        
+        return image
+    
     def _resize_maintain_aspect(self, image: Image.Image, max_dim: int) -> Image.Image:
         """Resize image maintaining aspect ratio"""
         w, h = image.size
@@ -65,28 +176,79 @@ class ImageProcessor:
             new_w = int(w * max_dim / h)
         return image.resize((new_w, new_h), Image.Resampling.LANCZOS)
     
-    def preprocess_for_yolo(self, image: Image.Image) -> np.ndarray:
+    def preprocess_for_yolo(
+        self,
+        image: Union[Image.Image, np.ndarray],
+        dtype: np.dtype = np.float32
+    ) -> np.ndarray:
         """
         Preprocess image specifically for YOLO inference.
         
-        Returns numpy array in YOLO format.
+        Accepts a PIL RGB image or a BGR array from load_array_from_*; arrays
+        are resized with OpenCV and never touch PIL. Returns a (1, 3, H, W)
+        array in YOLO format, filled by a single normalize-and-transpose pass
+        into a buffer that is reused by the next call on the same thread (copy
+        it if it must outlive that). With torch and CUDA available the buffer
+        is pinned memory; see yolo_input_tensor.
+        
+        Args:
+            image: Image to preprocess
+            dtype: float32 or float16 for inputs normalized to 0-1 (match
+                YOLODetector.input_dtype), or uint8 for raw 0-255 pixels as
+                taken by quantized engines that fold scaling into the graph
         """
         # Resize to YOLO input size
-        resized = image.resize((self.TARGET_SIZE, self.TARGET_SIZE), Image.Resampling.BILINEAR)
+        if isinstance(image, np.ndarray):
+            resized = cv2.resize(image, (self.TARGET_SIZE, self.TARGET_SIZE), interpolation=cv2.INTER_LINEAR)
+            resized = cv2.cvtColor(resized, cv2.COLOR_BGR2RGB)
+        else:
+            resized = image.resize((self.TARGET_SIZE, self.TARGET_SIZE), Image.Resampling.BILINEAR)
         
-        # Convert to numpy
-        arr = np.array(resized, dtype=np.float32)
+        dtype = np.dtype(dtype)
+        if dtype not in (np.float32, np.float16, np.uint8):
+            raise ValueError(f"Unsupported YOLO input dtype: {dtype}")
         
-        # Normalize to 0-1
-        arr = arr / 255.0
+        out = self._yolo_buffer(dtype)[0]
         
-        # HWC to CHW format
-        arr = np.transpose(arr, (2, 0, 1))
+        # HWC uint8 view -> CHW, written straight into the batch slot
+        chw = np.asarray(resized).transpose(2, 0, 1)
+        if dtype == np.uint8:
+            np.copyto(out[0], chw)
+        else:
+            # Normalize to 0-1 in the output precision
+            np.divide(chw, dtype.type(255), out=out[0])
         
-        # Add batch dimension
-        arr = np.expand_dims(arr, 0)
+        return out
+    
+    def yolo_input_tensor(self, dtype: np.dtype = np.float32):
+        """
+        Torch view of this thread's preprocess_for_yolo buffer for dtype.
         
-        return arr
+        Pinned when CUDA is available, so the inference call can upload it
+        with .to(device, non_blocking=True). The buffer is rewritten by the
+        next preprocess_for_yolo on the thread, so consume the upload first.
+        Returns None when torch is not installed.
+        """
+        if torch is None:
+            return None
+        return self._yolo_buffer(np.dtype(dtype))[1]
+    
+    def _yolo_buffer(self, dtype: np.dtype) -> Tuple[np.ndarray, Optional["torch.Tensor"]]:
+        """This thread's (array, tensor) pair for dtype, allocated on first use"""
+        buffers = getattr(self._yolo_buffers, "by_dtype", None)
+        if buffers is None:
+            buffers = self._yolo_buffers.by_dtype = {}
+        pair = buffers.get(dtype)
+        if pair is None:
+            shape = (1, 3, self.TARGET_SIZE, self.TARGET_SIZE)
+            if torch is not None:
+                torch_dtype = {np.float32: torch.float32, np.float16: torch.float16, np.uint8: torch.uint8}[dtype.type]
+                tensor = torch.empty(shape, dtype=torch_dtype, pin_memory=self._pin_memory)
+                pair = (tensor.numpy(), tensor)
+            else:
+                pair = (np.empty(shape, dtype=dtype), None)
+            buffers[dtype] = pair
+        return pair
     
     def get_image_info(self, image: Image.Image) -> dict:
         """Get image metadata"""
@@ -1,21 +1,37 @@
 import logging
-from typing import Dict, Any, List
+from collections import deque
+from typing import Deque, Dict, Any, List, Tuple
 from datetime import datetime
 
+from ml_service.utils.circuit_breaker import upstream_states
+
 logger = logging.getLogger(__name__)
 
 
 class ModelMetricsTracker:
-    """Track YOLO model performance metrics"""
+    """
+    Track YOLO model performance metrics.
+
+    Timing and detection statistics cover the most recent WINDOW inferences and
+    are maintained incrementally, so recording and reading metrics are O(1)
+    regardless of uptime.
+    """
+
+    WINDOW = 10_000
 
     def __init__(self):
         """Initialize metrics tracker"""
         logger.info("[v0] Initializing ModelMetricsTracker")
         self.total_inferences = 0
-        self.inference_times: List[float] = []
-        self.detections_per_inference: List[int] = []
+        self.inference_times: Deque[float] = deque(maxlen=self.WINDOW)
+        self.detections_per_inference: Deque[int] = deque(maxlen=self.WINDOW)
         self.species_counts: Dict[str, int] = {}
         self.accuracy_history: List[float] = []
+        self._time_sum = 0.0
+        self._detection_sum = 0
+        # Monotonic (inference number, time) queues: the front is the window min/max
+        self._time_min: Deque[Tuple[int, float]] = deque()
+        self._time_max: Deque[Tuple[int, float]] = deque()
 
     def record_inference(
         self,
@@ -24,9 +40,19 @@ class ModelMetricsTracker:
         species_list: List[str] = None,
     ) -> None:
         """Record an inference event"""
-        self.total_inferences += 1
+        if len(self.inference_times) == self.WINDOW:
+            # Oldest entries are about to be evicted by the bounded deques
+            self._time_sum -= self.inference_times[0]
+            self._detection_sum -= self.detections_per_inference[0]
         self.inference_times.append(inference_time_ms)
         self.detections_per_inference.append(detection_count)
+        self._time_sum += inference_time_ms
+        self._detection_sum += detection_count
+
+        index = self.total_inferences
+        self.total_inferences += 1
+        self._push_extreme(self._time_min, index, inference_time_ms, lambda old, new: old >= new)
+        self._push_extreme(self._time_max, index, inference_time_ms, lambda old, new: old <= new)
 
         if species_list:
             for species in species_list:
@@ -42,17 +68,12 @@ class ModelMetricsTracker:
         if not self.inference_times:
             return self._get_default_metrics()
 
-        avg_inference_time = sum(self.inference_times) / len(
-            self.inference_times
-        )
-        min_inference_time = min(self.inference_times)
-        max_inference_time = max(self.inference_times)
+        window = len(self.inference_times)
+        avg_inference_time = self._time_sum / window
+        min_inference_time = self._time_min[0][1]
+        max_inference_time = self._time_max[0][1]
 
-        avg_detections = (
-            sum(self.detections_per_inference) / len(self.detections_per_inference)
-            if self.detections_per_inference
-            else 0
-        )
+        avg_detections = self._detection_sum / window
 
         metrics = {
             "total_inferences": self.total_inferences,
@@ -72,12 +93,27 @@ class ModelMetricsTracker:
                 "coucha": 87,
                 "other": 92,
             },
+            "upstreams": upstream_states(),
             "last_updated": datetime.now().isoformat(),
         }
 
         logger.info(f"[v0] Metrics: {metrics}")
         return metrics
 
+    def _push_extreme(
+        self,
+        queue: Deque[Tuple[int, float]],
+        index: int,
+        value: float,
+        dominated,
+    ) -> None:
+        """Append to a monotonic queue, dropping entries that can no longer be the extreme"""
+        while queue and dominated(queue[-1][1], value):
+            queue.pop()
+        queue.append((index, value))
+        while queue[0][0] <= index - self.WINDOW:
+            queue.popleft()
+
     @staticmethod
     def _get_default_metrics() -> Dict[str, Any]:
         """Return default metrics when no inferences recorded"""
@@ -91,5 +127,6 @@ class ModelMetricsTracker:
             "recall": 0,
             "f1_score": 0.0,
             "species_accuracy": {"natalensis": 0, "coucha": 0, "other": 0},
+            "upstreams": upstream_states(),
             "last_updated": datetime.now().isoformat(),
         }
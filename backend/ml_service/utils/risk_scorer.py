@@ -1,9 +1,77 @@
+import bisect
 import logging
+import re
+import sys
+from functools import lru_cache
 from typing import List, Dict, Any
 from datetime import datetime
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
+# Numba is optional: when installed, score aggregation runs as a JIT kernel
+# (parallel across images for batch scoring); otherwise NumPy is used
+try:
+    import numba
+except ImportError:
+    numba = None
+
+
+def _score_kernel(confidences, weights, mastomys, count_mult):
+    """(final risk, avg species risk, valid count, Mastomys present) in one pass"""
+    total = 0.0
+    count = 0
+    high_conf_count = 0
+    mastomys_present = False
+    for i in range(confidences.shape[0]):
+        conf = confidences[i]
+        if conf > 0.3:
+            count += 1
+            total += weights[i] * conf
+            if conf > 0.8:
+                high_conf_count += 1
+            if mastomys[i]:
+                mastomys_present = True
+    if count == 0:
+        return 0.0, 0.0, 0, False
+    avg_species_risk = total / count
+    final_risk = (avg_species_risk * count_mult[min(count, 4)]
+                  + (0.3 if mastomys_present else 0.0)
+                  + min(high_conf_count * 0.05, 0.15))
+    return min(final_risk, 1.0), avg_species_risk, count, mastomys_present
+
+
+if numba is not None:
+    _score_kernel = numba.njit(cache=True, fastmath=True)(_score_kernel)
+
+    @numba.njit(cache=True, parallel=True, fastmath=True)
+    def _score_batch_kernel(confidences, weights, mastomys, lengths, count_mult, out):
+        for b in numba.prange(confidences.shape[0]):
+            n = lengths[b]
+            out[b] = _score_kernel(confidences[b, :n], weights[b, :n], mastomys[b, :n], count_mult)[0]
+
+# Geographic risk zones (Lassa endemic regions)
+ENDEMIC_REGIONS = {
+    "edo": 0.15, "ondo": 0.15, "ebonyi": 0.12, "bauchi": 0.10,
+    "plateau": 0.10, "taraba": 0.08, "nasarawa": 0.08,
+    "benue": 0.07, "kogi": 0.06
+}
+
+# One compiled matcher for every endemic name; the lookahead reports
+# overlapping matches so the best bonus is never shadowed
+_ENDEMIC_PATTERN = re.compile(
+    "(?=(" + "|".join(re.escape(name) for name in ENDEMIC_REGIONS) + "))"
+)
+
+
+@lru_cache(maxsize=1024)
+def _endemic_bonus(region: str) -> float:
+    """Largest endemic-region bonus whose name occurs in region (case-insensitive)"""
+    return max(
+        (ENDEMIC_REGIONS[name] for name in _ENDEMIC_PATTERN.findall(region.lower())),
+        default=0.0
+    )
+
 
 class RiskScorer:
     """
@@ -34,6 +102,35 @@ class RiskScorer:
         4: 0.95,     # Four+ - established population
     }
     
+    # Lower bound of every level above MINIMAL, ascending; levels and
+    # recommendations are indexed by bisect_right(LEVEL_THRESHOLDS, score)
+    LEVEL_THRESHOLDS = (0.2, 0.4, 0.6, 0.8)
+    LEVEL_NAMES = ("MINIMAL", "LOW", "MODERATE", "HIGH", "CRITICAL")
+    RECOMMENDATIONS = (
+        "MINIMAL: Standard monitoring protocols.",
+        "LOW: Continue routine surveillance. Document findings.",
+        "MODERATE: Increase monitoring frequency. Prepare control measures.",
+        "HIGH PRIORITY: Schedule rodent control intervention. Notify health surveillance unit.",
+        "IMMEDIATE ACTION: Deploy rodent control team. Alert local health authorities. Consider community screening.",
+    )
+    
+    # COUNT_MULTIPLIERS as an array indexed by min(count, 4)
+    COUNT_MULT_TABLE = np.array([0.0, *COUNT_MULTIPLIERS.values()])
+    
+    # Per-species lookup tables resolved once, so scoring is array indexing
+    # instead of dict lookups and lowercase substring tests per detection.
+    # Known species come first, then two slots for unlisted names (without /
+    # with "mastomys" in the name)
+    # Keys are interned to match the detector's interned labels, so lookups
+    # resolve on identity instead of comparing strings
+    SPECIES_TO_IDX = {sys.intern(species): i for i, species in enumerate(SPECIES_RISK)}
+    UNKNOWN_IDX = len(SPECIES_RISK)
+    UNKNOWN_MASTOMYS_IDX = UNKNOWN_IDX + 1
+    SPECIES_WEIGHTS = np.array([*SPECIES_RISK.values(), 0.05, 0.05])
+    SPECIES_IS_MASTOMYS = np.array(
+        ["mastomys" in species.lower() for species in SPECIES_RISK] + [False, True]
+    )
+    
     def __init__(self):
         logger.info("[RiskScorer] Initialized Lassa risk scoring engine")
     
@@ -50,54 +147,128 @@ class RiskScorer:
         if not detections:
             return 0.0
         
-        # Filter valid detections
-        valid_detections = [d for d in detections if d.get("confidence", 0) > 0.3]
+        # Marshal the detections into columns once; everything else is table lookups
+        n = len(detections)
+        confidences = np.fromiter((d.get("confidence", 0) for d in detections), dtype=np.float64, count=n)
+        species_idx = np.fromiter(
+            (self._species_index(d.get("species", "Unknown")) for d in detections), dtype=np.intp, count=n
+        )
+        reservoir = np.fromiter((d.get("is_primary_reservoir", False) for d in detections), dtype=bool, count=n)
+        
+        return self._score_arrays(
+            confidences,
+            self.SPECIES_WEIGHTS[species_idx],
+            self.SPECIES_IS_MASTOMYS[species_idx] | reservoir
+        )
+    
+    def score_detection_batches(self, batches: List[List[Dict[str, Any]]]) -> List[float]:
+        """
+        Score many detection lists at once (e.g. re-scoring a day of images).
+        
+        Same per-list result as score_detections. The lists are packed into
+        padded (images, max detections) arrays; with Numba the images are
+        scored in parallel by one kernel call, and per-image logging is skipped.
+        """
+        if not batches:
+            return []
         
-        if not valid_detections:
+        lengths = np.fromiter((len(dets) for dets in batches), dtype=np.intp, count=len(batches))
+        width = max(int(lengths.max()), 1)
+        confidences = np.zeros((len(batches), width))
+        species_idx = np.full((len(batches), width), self.UNKNOWN_IDX, dtype=np.intp)
+        reservoir = np.zeros((len(batches), width), dtype=bool)
+        for b, dets in enumerate(batches):
+            for i, d in enumerate(dets):
+                confidences[b, i] = d.get("confidence", 0)
+                species_idx[b, i] = self._species_index(d.get("species", "Unknown"))
+                reservoir[b, i] = d.get("is_primary_reservoir", False)
+        weights = self.SPECIES_WEIGHTS[species_idx]
+        mastomys = self.SPECIES_IS_MASTOMYS[species_idx] | reservoir
+        
+        if numba is not None:
+            scores = np.empty(len(batches))
+            _score_batch_kernel(confidences, weights, mastomys, lengths, self.COUNT_MULT_TABLE, scores)
+        else:
+            # Padding has confidence 0, so it never passes the validity filter
+            scores = [self._aggregate(confidences[b], weights[b], mastomys[b])[0] for b in range(len(batches))]
+        return [round(float(score), 4) for score in scores]
+    
+    def score_soa(self, soa: Dict[str, np.ndarray]) -> float:
+        """
+        Score detections given as per-field arrays (YOLODetector.predict_soa).
+        
+        Same result as score_detections, computed with array reductions.
+        """
+        if len(soa["conf"]) == 0:
             return 0.0
         
-        # Calculate weighted species risk
-        species_scores = []
-        for det in valid_detections:
-            species = det.get("species", "Unknown")
-            confidence = det.get("confidence", 0.5)
-            species_weight = self.SPECIES_RISK.get(species, 0.05)
-            
-            # Weighted by detection confidence
-            species_scores.append(species_weight * confidence)
+        # Resolve each distinct species once, then broadcast back to detections
+        species, inverse = np.unique(soa["species"].astype(str), return_inverse=True)
+        species_idx = np.array([self._species_index(name) for name in species], dtype=np.intp)[inverse]
+        
+        return self._score_arrays(
+            soa["conf"].astype(np.float64),
+            self.SPECIES_WEIGHTS[species_idx],
+            self.SPECIES_IS_MASTOMYS[species_idx] | soa["is_primary_reservoir"]
+        )
+    
+    def _species_index(self, species: str) -> int:
+        """Row of a species name in the SPECIES_* lookup tables"""
+        idx = self.SPECIES_TO_IDX.get(species)
+        if idx is None:
+            idx = self.UNKNOWN_MASTOMYS_IDX if "mastomys" in species.lower() else self.UNKNOWN_IDX
+        return idx
+    
+    def _score_arrays(self, confidences: np.ndarray, weights: np.ndarray, mastomys: np.ndarray) -> float:
+        """Aggregate risk from per-detection confidence, species weight and Mastomys flag arrays"""
+        if numba is not None:
+            final_risk, avg_species_risk, count, mastomys_present = _score_kernel(
+                confidences, weights, mastomys, self.COUNT_MULT_TABLE
+            )
+        else:
+            final_risk, avg_species_risk, count, mastomys_present = self._aggregate(confidences, weights, mastomys)
+        
+        if count == 0:
+            return 0.0
         
-        # Average species risk
-        avg_species_risk = sum(species_scores) / len(species_scores)
+        logger.info("[RiskScorer] Score: %.3f (species=%.2f, count=%d, mastomys=%s)",
+                    final_risk, avg_species_risk, count, mastomys_present)
+        
+        return round(final_risk, 4)
+    
+    def _aggregate(self, confidences: np.ndarray, weights: np.ndarray, mastomys: np.ndarray):
+        """NumPy version of _score_kernel"""
+        # Filter valid detections
+        valid = confidences > 0.3
+        count = int(valid.sum())
+        
+        if count == 0:
+            return 0.0, 0.0, 0, False
+        
+        confidences = confidences[valid]
+        
+        # Average species risk, weighted by detection confidence
+        avg_species_risk = float(np.dot(weights[valid], confidences)) / count
         
         # Count multiplier (more detections = higher confidence in presence)
-        count = len(valid_detections)
         if count >= 4:
             count_mult = 0.95
         else:
             count_mult = self.COUNT_MULTIPLIERS.get(count, 0.5)
         
-        # Check for Mastomys specifically (primary concern)
-        mastomys_present = any(
-            "mastomys" in d.get("species", "").lower() or
-            d.get("is_primary_reservoir", False)
-            for d in valid_detections
-        )
-        
         # Mastomys bonus (if detected, minimum risk floor)
+        mastomys_present = bool(mastomys[valid].any())
         mastomys_bonus = 0.3 if mastomys_present else 0.0
         
         # High confidence detection bonus
-        high_conf_count = sum(1 for d in valid_detections if d.get("confidence", 0) > 0.8)
+        high_conf_count = int((confidences > 0.8).sum())
         confidence_bonus = min(high_conf_count * 0.05, 0.15)
         
         # Calculate final risk
         base_risk = avg_species_risk * count_mult
         final_risk = min(base_risk + mastomys_bonus + confidence_bonus, 1.0)
         
-        logger.info(f"[RiskScorer] Score: {final_risk:.3f} "
-                   f"(species={avg_species_risk:.2f}, count={count}, mastomys={mastomys_present})")
-        
-        return round(final_risk, 4)
+        return final_risk, avg_species_risk, count, mastomys_present
     
     def score_with_context(
         self,
@@ -114,20 +285,7 @@ class RiskScorer:
         """
         base_score = self.score_detections(detections)
         
-        # Geographic risk zones (Lassa endemic regions)
-        endemic_regions = {
-            "edo": 0.15, "ondo": 0.15, "ebonyi": 0.12, "bauchi": 0.10,
-            "plateau": 0.10, "taraba": 0.08, "nasarawa": 0.08,
-            "benue": 0.07, "kogi": 0.06
-        }
-        
-        geo_bonus = 0.0
-        if region:
-            region_lower = region.lower()
-            for endemic, bonus in endemic_regions.items():
-                if endemic in region_lower:
-                    geo_bonus = bonus
-                    break
+        geo_bonus = _endemic_bonus(region) if region else 0.0
         
         # Seasonal risk (dry season = higher risk)
         seasonal_bonus = 0.0
@@ -168,24 +326,12 @@ class RiskScorer:
     
     def _score_to_level(self, score: float) -> str:
         """Convert numeric score to risk level"""
-        if score >= 0.8:
-            return "CRITICAL"
-        elif score >= 0.6:
-            return "HIGH"
-        elif score >= 0.4:
-            return "MODERATE"
-        elif score >= 0.2:
-            return "LOW"
-        return "MINIMAL"
+        return self.LEVEL_NAMES[bisect.bisect_right(self.LEVEL_THRESHOLDS, score)]
     
     def _get_recommendation(self, score: float, mastomys_count: int) -> str:
         """Generate action recommendation based on risk"""
-        if score >= 0.8 or mastomys_count >= 3:
-            return "IMMEDIATE ACTION: Deploy rodent control team. Alert local health authorities. Consider community screening."
-        elif score >= 0.6 or mastomys_count >= 2:
-            return "HIGH PRIORITY: Schedule rodent control intervention. Notify health surveillance unit."
-        elif score >= 0.4 or mastomys_count >= 1:
-            return "MODERATE: Increase monitoring frequency. Prepare control measures."
-        elif score >= 0.2:
-            return "LOW: Continue routine surveillance. Document findings."
-        return "MINIMAL: Standard monitoring protocols."
+        tier = bisect.bisect_right(self.LEVEL_THRESHOLDS, score)
+        # Each Mastomys sighting escalates to at least MODERATE, three to the top tier
+        if mastomys_count > 0:
+            tier = max(tier, min(mastomys_count, 3) + 1)
+        return self.RECOMMENDATIONS[tier]
@@ -1,8 +1,42 @@
+import hashlib
 import logging
+import os
+from pathlib import Path
 from typing import Dict, List, Any, Optional
 
 logger = logging.getLogger(__name__)
 
+# Columns read from the SORMAS data dictionary
+DICTIONARY_COLUMNS = ["Field", "Type", "Description"]
+EXCEL_SUFFIXES = (".xlsx", ".xls")
+
+
+def read_excel(path, **kwargs):
+    """
+    Read a workbook with the Rust calamine engine when python-calamine is
+    installed, otherwise with openpyxl (which pandas opens read-only)
+    """
+    import pandas as pd
+    try:
+        return pd.read_excel(path, engine="calamine", **kwargs)
+    except (ImportError, ValueError):
+        # ValueError: pandas older than 2.2 does not know the engine
+        return pd.read_excel(path, engine="openpyxl", **kwargs)
+
+
+def read_dictionary_export(path):
+    """
+    Read the Field/Type/Description columns of a SORMAS data dictionary
+    CSV/Excel export as strings, dropping rows without a field name.
+    Blank cells become "" rather than the string "nan".
+    """
+    import pandas as pd
+    if Path(path).suffix.lower() in EXCEL_SUFFIXES:
+        dictionary = read_excel(path, usecols=DICTIONARY_COLUMNS)
+    else:
+        dictionary = pd.read_csv(path, usecols=DICTIONARY_COLUMNS)
+    return dictionary.dropna(subset=["Field"]).fillna("").astype(str)
+
 
 class SORMASParser:
     """
@@ -59,15 +93,92 @@ class SORMASParser:
     def __init__(self, data_dict_path: str = None):
         """Initialize parser with optional data dictionary path"""
         self.fields = self.LASSA_FIELDS.copy()
-        logger.info("[SORMASParser] Initialized with Lassa fever schema")
+        # Generic data dictionary, kept as an Arrow table; definitions are read
+        # from it by row on lookup instead of being materialized up front
+        self.dictionary = None
+        self._dictionary_rows: Dict[str, int] = {}
+        if data_dict_path:
+            self.dictionary = self._load_dictionary(data_dict_path)
+            for row, name in enumerate(self.dictionary.column("Field").to_pylist()):
+                # Curated Lassa definitions take precedence over the generic dictionary
+                if name and name not in self.fields:
+                    self._dictionary_rows.setdefault(name, row)
+        self._field_names = [*self.fields, *self._dictionary_rows]
+        # Case-insensitive index; the first spelling wins, so curated fields shadow dictionary ones
+        self._names_by_lower: Dict[str, str] = {}
+        for name in self._field_names:
+            self._names_by_lower.setdefault(name.lower(), name)
+        logger.info(f"[SORMASParser] Initialized with Lassa fever schema ({len(self._field_names)} fields)")
+    
+    @classmethod
+    def _load_dictionary(cls, path: str):
+        """
+        Load the Field/Type/Description table from a memory-mapped Feather data dictionary.
+        
+        Build the file from the SORMAS Excel export with
+        scripts/build-clinical-cache.py, or pass the Excel export itself to
+        have it converted once and cached (see _read_excel_dictionary).
+        """
+        from pyarrow import feather
+        if Path(path).suffix.lower() in EXCEL_SUFFIXES:
+            table = cls._read_excel_dictionary(Path(path))
+        else:
+            table = feather.read_table(path, columns=DICTIONARY_COLUMNS, memory_map=True)
+        return table
+    
+    @staticmethod
+    def _read_excel_dictionary(xlsx_path: Path):
+        """
+        Read an Excel data dictionary through a Feather copy cached in .cache/
+        next to it, keyed by the workbook's SHA-1 so an edited export is never
+        served stale. Only the first load of a given workbook pays for Excel parsing.
+        """
+        import pyarrow as pa
+        from pyarrow import feather
+        
+        digest = hashlib.sha1(xlsx_path.read_bytes()).hexdigest()
+        cache_path = xlsx_path.parent / ".cache" / f"sormas_{digest}.feather"
+        if cache_path.exists():
+            return feather.read_table(cache_path, columns=DICTIONARY_COLUMNS, memory_map=True)
+        
+        logger.info(f"[SORMASParser] Converting {xlsx_path.name} to Feather cache")
+        table = pa.Table.from_pandas(read_dictionary_export(xlsx_path), preserve_index=False)
+        
+        try:
+            cache_path.parent.mkdir(exist_ok=True)
+            # Write then rename, so a concurrent or interrupted start never maps a partial file
+            tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+            feather.write_feather(table, tmp_path, compression="uncompressed")
+            tmp_path.replace(cache_path)
+        except OSError as e:
+            logger.warning(f"[SORMASParser] Could not write dictionary cache: {e}")
+        return table
     
     def get_all_fields(self) -> List[str]:
         """Get list of all field names"""
-        return list(self.fields.keys())
+        return self._field_names
     
     def get_field_definition(self, field_name: str) -> Optional[Dict[str, Any]]:
-        """Get definition for a specific field"""
-        return self.fields.get(field_name)
+        """Get definition for a specific field, matching the name case-insensitively"""
+        name = field_name
+        if name not in self.fields and name not in self._dictionary_rows:
+            name = self._names_by_lower.get(field_name.lower())
+        if name in self.fields:
+            return self.fields[name]
+        row = self._dictionary_rows.get(name)
+        if row is None:
+            return None
+        field_type = self.dictionary.column("Type")[row].as_py()
+        return {"type": (field_type or "").lower(), "description": self.dictionary.column("Description")[row].as_py()}
+    
+    def dictionary_column(self, column: str):
+        """
+        Zero-copy view (pyarrow ChunkedArray) of a data dictionary column, or
+        None when no dictionary was loaded
+        """
+        if self.dictionary is None:
+            return None
+        return self.dictionary.column(column)
     
     def parse_case(self, raw_data: Dict[str, Any]) -> Dict[str, Any]:
         """Parse raw SORMAS case data into normalized format"""
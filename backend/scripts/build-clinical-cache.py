@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Convert clinical case and SORMAS data dictionary exports to Feather files.
+The ML service memory-maps these at startup instead of parsing CSV/Excel.
+
+Requires the backend package to be installed (pip install -e backend/), which
+provides the ml_service readers this script shares with the SORMAS parser.
+
+Usage:
+    python scripts/build-clinical-cache.py --cases cases.csv --sormas dictionary.xlsx --out data/
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+from pyarrow import feather
+
+from ml_service.utils.sormas_parser import EXCEL_SUFFIXES, read_dictionary_export, read_excel
+
+
+def read_table(path: Path, **kwargs) -> pd.DataFrame:
+    """Read a CSV or Excel export into a DataFrame"""
+    if path.suffix.lower() in EXCEL_SUFFIXES:
+        return read_excel(path, **kwargs)
+    return pd.read_csv(path, **kwargs)
+
+
+def read_cases(path: Path) -> pa.Table:
+    """Read the cases export, parsing CSVs directly into Arrow without pandas"""
+    if path.suffix.lower() == ".csv":
+        return pacsv.read_csv(path)
+    return pa.Table.from_pandas(read_table(path), preserve_index=False)
+
+
+def write_feather(data, out_path: Path):
+    """Write a DataFrame or Arrow table as an uncompressed Feather file so it can be memory-mapped"""
+    table = data if isinstance(data, pa.Table) else pa.Table.from_pandas(data, preserve_index=False)
+    feather.write_feather(table, out_path, compression="uncompressed")
+    print(f"Wrote {table.num_rows} rows to {out_path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build Feather caches for the ML service")
+    parser.add_argument("--cases", type=Path, help="Clinical cases CSV/Excel export")
+    parser.add_argument("--sormas", type=Path, help="SORMAS data dictionary CSV/Excel export")
+    parser.add_argument("--out", type=Path, default=Path("."), help="Output directory")
+    args = parser.parse_args()
+
+    if not args.cases and not args.sormas:
+        parser.error("Nothing to do: pass --cases and/or --sormas")
+
+    args.out.mkdir(parents=True, exist_ok=True)
+
+    if args.cases:
+        write_feather(read_cases(args.cases), args.out / "clinical.feather")
+
+    if args.sormas:
+        write_feather(read_dictionary_export(args.sormas), args.out / "sormas.feather")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,16 +4,22 @@ Integration test script for Skyhawk backend services.
 Tests service connectivity and basic functionality.
 """
 
-import requests
+import asyncio
+import aiohttp
 import json
 import sys
-from typing import Dict, Tuple
+from typing import Dict, List, Tuple
 
 # Service URLs
 ML_SERVICE_URL = "http://localhost:5001"
 API_SERVICE_URL = "http://localhost:5002"
 AGENT_SERVICE_URL = "http://localhost:5003"
 
+TIMEOUT = aiohttp.ClientTimeout(total=5)
+
+# Result of one suite: (passed, total, output lines)
+SuiteResult = Tuple[int, int, List[str]]
+
 class Colors:
     GREEN = '\033[92m'
     RED = '\033[91m'
@@ -21,114 +27,112 @@ class Colors:
     BLUE = '\033[94m'
     END = '\033[0m'
 
+def header(text: str) -> str:
+    return f"\n{Colors.BLUE}{'='*60}\n{text}\n{'='*60}{Colors.END}\n"
+
 def print_header(text: str):
-    print(f"\n{Colors.BLUE}{'='*60}")
-    print(f"{text}")
-    print(f"{'='*60}{Colors.END}\n")
+    print(header(text))
 
-def test_service(name: str, url: str) -> Tuple[bool, str]:
+async def test_service(session: aiohttp.ClientSession, name: str, url: str) -> Tuple[bool, str]:
     """Test if a service is running"""
     try:
-        response = requests.get(f"{url}/health", timeout=5)
-        if response.status_code == 200:
-            return True, "Healthy"
-        else:
-            return False, f"HTTP {response.status_code}"
-    except requests.exceptions.ConnectionError:
+        async with session.get(f"{url}/health", timeout=TIMEOUT) as response:
+            if response.status == 200:
+                return True, "Healthy"
+            else:
+                return False, f"HTTP {response.status}"
+    except aiohttp.ClientConnectionError:
         return False, "Connection refused"
     except Exception as e:
-        return False, str(e)
+        return False, str(e) or type(e).__name__
 
-def test_ml_service():
+async def test_ml_service(session: aiohttp.ClientSession) -> SuiteResult:
     """Test ML Service endpoints"""
-    print_header("ML SERVICE TESTS")
-    
+    lines = [header("ML SERVICE TESTS")]
     tests_passed = 0
     tests_total = 0
     
     # Test health
     tests_total += 1
-    success, msg = test_service("ML Service", ML_SERVICE_URL)
+    success, msg = await test_service(session, "ML Service", ML_SERVICE_URL)
     status = f"{Colors.GREEN}✓{Colors.END}" if success else f"{Colors.RED}✗{Colors.END}"
-    print(f"{status} Health Check: {msg}")
+    lines.append(f"{status} Health Check: {msg}")
     if success: tests_passed += 1
     
     # Test model info
     tests_total += 1
     try:
-        response = requests.get(f"{ML_SERVICE_URL}/model/info", timeout=5)
-        if response.status_code == 200:
-            print(f"{Colors.GREEN}✓{Colors.END} Model Info: {response.json().get('model', 'Unknown')}")
-            tests_passed += 1
-        else:
-            print(f"{Colors.RED}✗{Colors.END} Model Info: HTTP {response.status_code}")
+        async with session.get(f"{ML_SERVICE_URL}/model/info", timeout=TIMEOUT) as response:
+            if response.status == 200:
+                info = await response.json()
+                lines.append(f"{Colors.GREEN}✓{Colors.END} Model Info: {info.get('model', 'Unknown')}")
+                tests_passed += 1
+            else:
+                lines.append(f"{Colors.RED}✗{Colors.END} Model Info: HTTP {response.status}")
     except Exception as e:
-        print(f"{Colors.RED}✗{Colors.END} Model Info: {e}")
+        lines.append(f"{Colors.RED}✗{Colors.END} Model Info: {e}")
     
-    return tests_passed, tests_total
+    return tests_passed, tests_total, lines
 
-def test_api_service():
+async def test_api_service(session: aiohttp.ClientSession) -> SuiteResult:
     """Test API Service endpoints"""
-    print_header("API SERVICE TESTS")
-    
+    lines = [header("API SERVICE TESTS")]
     tests_passed = 0
     tests_total = 0
     
     # Test health
     tests_total += 1
-    success, msg = test_service("API Service", API_SERVICE_URL)
+    success, msg = await test_service(session, "API Service", API_SERVICE_URL)
     status = f"{Colors.GREEN}✓{Colors.END}" if success else f"{Colors.RED}✗{Colors.END}"
-    print(f"{status} Health Check: {msg}")
+    lines.append(f"{status} Health Check: {msg}")
     if success: tests_passed += 1
     
     # Test detections endpoint
     tests_total += 1
     try:
-        response = requests.get(f"{API_SERVICE_URL}/detections", timeout=5)
-        if response.status_code == 200:
-            count = len(response.json().get('data', []))
-            print(f"{Colors.GREEN}✓{Colors.END} Get Detections: {count} records found")
-            tests_passed += 1
-        else:
-            print(f"{Colors.RED}✗{Colors.END} Get Detections: HTTP {response.status_code}")
+        async with session.get(f"{API_SERVICE_URL}/detections", timeout=TIMEOUT) as response:
+            if response.status == 200:
+                count = len((await response.json()).get('data', []))
+                lines.append(f"{Colors.GREEN}✓{Colors.END} Get Detections: {count} records found")
+                tests_passed += 1
+            else:
+                lines.append(f"{Colors.RED}✗{Colors.END} Get Detections: HTTP {response.status}")
     except Exception as e:
-        print(f"{Colors.RED}✗{Colors.END} Get Detections: {e}")
+        lines.append(f"{Colors.RED}✗{Colors.END} Get Detections: {e}")
     
-    return tests_passed, tests_total
+    return tests_passed, tests_total, lines
 
-def test_agent_service():
+async def test_agent_service(session: aiohttp.ClientSession) -> SuiteResult:
     """Test Agent Service endpoints"""
-    print_header("AGENT SERVICE TESTS")
-    
+    lines = [header("AGENT SERVICE TESTS")]
     tests_passed = 0
     tests_total = 0
     
     # Test health
     tests_total += 1
-    success, msg = test_service("Agent Service", AGENT_SERVICE_URL)
+    success, msg = await test_service(session, "Agent Service", AGENT_SERVICE_URL)
     status = f"{Colors.GREEN}✓{Colors.END}" if success else f"{Colors.RED}✗{Colors.END}"
-    print(f"{status} Health Check: {msg}")
+    lines.append(f"{status} Health Check: {msg}")
     if success: tests_passed += 1
     
     # Test alerts endpoint
     tests_total += 1
     try:
-        response = requests.get(f"{AGENT_SERVICE_URL}/agent/alerts", timeout=5)
-        if response.status_code == 200:
-            alerts = response.json().get('alerts', [])
-            print(f"{Colors.GREEN}✓{Colors.END} Get Alerts: {len(alerts)} alerts found")
-            tests_passed += 1
-        else:
-            print(f"{Colors.RED}✗{Colors.END} Get Alerts: HTTP {response.status_code}")
+        async with session.get(f"{AGENT_SERVICE_URL}/agent/alerts", timeout=TIMEOUT) as response:
+            if response.status == 200:
+                alerts = (await response.json()).get('alerts', [])
+                lines.append(f"{Colors.GREEN}✓{Colors.END} Get Alerts: {len(alerts)} alerts found")
+                tests_passed += 1
+            else:
+                lines.append(f"{Colors.RED}✗{Colors.END} Get Alerts: HTTP {response.status}")
     except Exception as e:
-        print(f"{Colors.RED}✗{Colors.END} Get Alerts: {e}")
+        lines.append(f"{Colors.RED}✗{Colors.END} Get Alerts: {e}")
     
-    return tests_passed, tests_total
+    return tests_passed, tests_total, lines
 
-def test_inter_service_communication():
+async def test_inter_service_communication(session: aiohttp.ClientSession) -> SuiteResult:
     """Test services can communicate with each other"""
-    print_header("INTER-SERVICE COMMUNICATION TESTS")
-    
+    lines = [header("INTER-SERVICE COMMUNICATION TESTS")]
     tests_passed = 0
     tests_total = 0
     
@@ -136,20 +140,33 @@ def test_inter_service_communication():
     tests_total += 1
     try:
         # This would be tested via API making a call to ML service
-        print(f"{Colors.YELLOW}⊙{Colors.END} API → ML Service: (checked via service logs)")
+        lines.append(f"{Colors.YELLOW}⊙{Colors.END} API → ML Service: (checked via service logs)")
         tests_passed += 1
     except Exception as e:
-        print(f"{Colors.RED}✗{Colors.END} API → ML Service: {e}")
+        lines.append(f"{Colors.RED}✗{Colors.END} API → ML Service: {e}")
     
     # Test Agent can reach API Service
     tests_total += 1
     try:
-        print(f"{Colors.YELLOW}⊙{Colors.END} Agent → API Service: (checked via service logs)")
+        lines.append(f"{Colors.YELLOW}⊙{Colors.END} Agent → API Service: (checked via service logs)")
         tests_passed += 1
     except Exception as e:
-        print(f"{Colors.RED}✗{Colors.END} Agent → API Service: {e}")
+        lines.append(f"{Colors.RED}✗{Colors.END} Agent → API Service: {e}")
     
-    return tests_passed, tests_total
+    return tests_passed, tests_total, lines
+
+async def run_suites() -> List[SuiteResult]:
+    """Run every suite concurrently over one pooled session"""
+    # Keep-alive pool shared by all checks: each service is connected to at
+    # most limit_per_host times and those sockets are reused by later requests
+    connector = aiohttp.TCPConnector(limit=16, limit_per_host=8, ttl_dns_cache=300)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        return await asyncio.gather(
+            test_ml_service(session),
+            test_api_service(session),
+            test_agent_service(session),
+            test_inter_service_communication(session),
+        )
 
 def main():
     """Run all integration tests"""
@@ -162,22 +179,11 @@ def main():
     total_passed = 0
     total_tests = 0
     
-    # Run all test suites
-    passed, total = test_ml_service()
-    total_passed += passed
-    total_tests += total
-    
-    passed, total = test_api_service()
-    total_passed += passed
-    total_tests += total
-    
-    passed, total = test_agent_service()
-    total_passed += passed
-    total_tests += total
-    
-    passed, total = test_inter_service_communication()
-    total_passed += passed
-    total_tests += total
+    # Run all test suites, then report them in order
+    for passed, total, lines in asyncio.run(run_suites()):
+        print("\n".join(lines))
+        total_passed += passed
+        total_tests += total
     
     # Summary
     print_header("SUMMARY")
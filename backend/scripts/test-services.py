@@ -68,11 +68,7 @@ async def main():
     print("Testing Skyhawk Services\n")
     
     async with aiohttp.ClientSession() as session:
-        results = []
-        for test in TESTS:
-            result = await run_test(session, test)
-            results.append(result)
-            await asyncio.sleep(0.5)
+        results = await asyncio.gather(*(run_test(session, test) for test in TESTS))
     
     print(f"\n{'='*40}")
     passed = sum(results)
@@ -17,6 +17,12 @@ CREATE TABLE IF NOT EXISTS detection_patterns (
 CREATE INDEX idx_detection_timestamp ON detection_patterns(detection_timestamp DESC);
 CREATE INDEX idx_detection_source ON detection_patterns(source);
 
+-- Index for radius queries: earth_box() lookups hit this instead of
+-- computing earth_distance() against every row
+CREATE EXTENSION IF NOT EXISTS cube;
+CREATE EXTENSION IF NOT EXISTS earthdistance;
+CREATE INDEX idx_detection_location ON detection_patterns USING gist (ll_to_earth(latitude, longitude));
+
 -- Enable realtime
 ALTER PUBLICATION supabase_realtime ADD TABLE detection_patterns;
 